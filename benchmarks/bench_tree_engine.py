@@ -0,0 +1,82 @@
+"""
+Latency of native predict vs the flattened NumPy tree engine and, for
+XGBoost models, the ``Booster.inplace_predict`` backend.
+
+Usage:
+  python benchmarks/bench_tree_engine.py [--repeats 20]
+
+Benchmarks every model in models/ that the engine supports. When
+models/random_forest.joblib is not present, a RandomForestRegressor with the
+project's default settings is fitted on random data of the same shape as the
+training set (2277 x 260) so both ensemble types are always covered.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model_utils import get_default_models  # noqa: E402
+from src.tree_engine import EQUIVALENCE_ATOL, EQUIVALENCE_RTOL, flatten_model  # noqa: E402
+from src.xgboost_backend import XGBoostInplaceBackend  # noqa: E402
+
+BATCH_SIZES = (1, 64, 10_000)
+
+
+def load_models():
+    models = {}
+    for path in sorted((ROOT / "models").glob("*.joblib")):
+        if path.stem.endswith(("_metadata", "_encoder")):
+            continue
+        models[path.stem] = joblib.load(path)
+    if "random_forest" not in models:
+        rng = np.random.default_rng(42)
+        X = rng.normal(size=(2277, 260)).astype(np.float32)
+        y = X[:, :10].sum(axis=1) * 10000 + 180000
+        models["random_forest (synthetic)"] = get_default_models()["Random Forest"].fit(X, y)
+    return models
+
+
+def time_call(fn, X, repeats):
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    rng = np.random.default_rng(0)
+    print(f"{'model':<28}{'batch':>8}{'native ms':>12}{'numpy ms':>12}{'speedup':>9}{'inplace ms':>12}")
+    for name, model in load_models().items():
+        flat = flatten_model(model)
+        inplace = None
+        if hasattr(model, "get_booster"):
+            inplace = XGBoostInplaceBackend(model, model.get_booster().feature_names or range(model.n_features_in_))
+        X_all = rng.normal(size=(max(BATCH_SIZES), model.n_features_in_)).astype(np.float32)
+        native, engine = model.predict(X_all), flat.predict(X_all)
+        ok = np.allclose(engine, native, rtol=EQUIVALENCE_RTOL, atol=EQUIVALENCE_ATOL)
+        for n in BATCH_SIZES:
+            X = X_all[:n]
+            repeats = max(1, args.repeats // (10 if n >= 10_000 else 1))
+            t_native = time_call(model.predict, X, repeats)
+            t_numpy = time_call(flat.predict, X, repeats)
+            t_inplace = f"{time_call(inplace.predict, X, repeats):>12.3f}" if inplace else f"{'-':>12}"
+            print(f"{name:<28}{n:>8}{t_native:>12.3f}{t_numpy:>12.3f}{t_native / t_numpy:>8.1f}x{t_inplace}")
+        print(f"{'':<28}equivalent within tolerance: {ok} (max abs diff {np.max(np.abs(engine - native)):.3g})")
+
+
+if __name__ == "__main__":
+    main()
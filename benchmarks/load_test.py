@@ -0,0 +1,210 @@
+"""
+Load generator for a running API server.
+
+Usage:
+  python benchmarks/load_test.py --concurrency 16 --duration 30
+  python benchmarks/load_test.py --qps 200 --duration 60 --model xgboost
+  python benchmarks/load_test.py --endpoint batch --batch-size 100 --concurrency 4 --output rf.json
+
+Closed loop (``--concurrency N``): N clients each send their next request as
+soon as the previous one returns. Open loop (``--qps R``): requests start on
+a Poisson schedule at R per second whatever the server's latency, and
+latency is measured from each request's scheduled start, so a stalled server
+shows up as queueing delay instead of silently lowering the offered load
+(coordinated omission). At most ``--max-inflight`` open-loop requests run at
+once; requests beyond that are counted as dropped.
+
+Payloads are raw listings sampled from docs/datasets/AmesHousing.csv, so
+requests vary like real traffic (repeats can hit the prediction cache).
+Every ``--interval`` seconds a line with throughput, error rate and
+p50/p90/p99/max latency is printed; ``--output`` saves the windows and the
+overall summary as JSON for plotting capacity curves.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from run_benchmarks import sample_rows  # noqa: E402
+
+
+class Recorder:
+    """Latency samples grouped into reporting windows"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.samples = []  # (completed at, latency ms, ok)
+        self.dropped = 0
+        self.windows = []
+        self._reported = 0
+
+    def record(self, latency_ms, ok):
+        self.samples.append((time.perf_counter() - self.start, latency_ms, ok))
+
+    @staticmethod
+    def summarize(samples, seconds, dropped=0):
+        latencies = np.array([lat for _, lat, _ in samples]) if samples else np.zeros(0)
+        errors = sum(1 for _, _, ok in samples if not ok)
+        total = len(samples) + dropped
+        pct = (lambda q: float(np.percentile(latencies, q))) if len(latencies) else (lambda q: None)
+        return {
+            'requests': len(samples),
+            'throughput_rps': len(samples) / seconds if seconds else 0.0,
+            'error_rate': (errors + dropped) / total if total else 0.0,
+            'dropped': dropped,
+            'p50_ms': pct(50),
+            'p90_ms': pct(90),
+            'p99_ms': pct(99),
+            'max_ms': float(latencies.max()) if len(latencies) else None,
+        }
+
+    def report_window(self):
+        now = time.perf_counter() - self.start
+        new = self.samples[self._reported:]
+        self._reported = len(self.samples)
+        window = {'t': round(now, 1), **self.summarize(new, self.interval)}
+        self.windows.append(window)
+        print(format_line(window), flush=True)
+
+    def overall(self):
+        elapsed = time.perf_counter() - self.start
+        return self.summarize(self.samples, elapsed, self.dropped)
+
+
+def format_line(s):
+    def ms(v):
+        return f"{v:8.1f}" if v is not None else f"{'-':>8}"
+    return (
+        (f"t={s['t']:6.1f}s " if 't' in s else '')
+        + f"{s['throughput_rps']:8.1f} req/s  err {s['error_rate']:6.2%}  "
+        f"p50 {ms(s['p50_ms'])}  p90 {ms(s['p90_ms'])}  p99 {ms(s['p99_ms'])}  max {ms(s['max_ms'])} ms"
+    )
+
+
+def make_payloads(args):
+    """Request path and a function cycling through pre-encoded bodies.
+
+    Encoding is done up front so the generator's own CPU use does not cap
+    the offered load.
+    """
+    rows = sample_rows(args.pool, seed=args.seed)
+    if args.endpoint == 'batch':
+        rng = random.Random(args.seed)
+        path = '/predict/batch'
+        payloads = [
+            {'instances': rng.sample(rows, min(args.batch_size, len(rows))), 'model_name': args.model}
+            for _ in range(max(1, args.pool // args.batch_size))
+        ]
+    else:
+        path = '/predict'
+        payloads = [{'features': row, 'model_name': args.model} for row in rows]
+    bodies = itertools.cycle([json.dumps(p).encode() for p in payloads])
+    return path, bodies.__next__
+
+
+async def send(client, path, body, recorder, started):
+    try:
+        resp = await client.post(path, content=body, headers={'Content-Type': 'application/json'})
+        ok = resp.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    recorder.record((time.perf_counter() - started) * 1000, ok)
+
+
+async def closed_loop(client, path, next_body, recorder, concurrency, deadline):
+    async def worker():
+        while time.perf_counter() < deadline:
+            await send(client, path, next_body(), recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(client, path, next_body, recorder, qps, deadline, max_inflight, seed):
+    rng = random.Random(seed)
+    inflight = set()
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            recorder.dropped += 1
+        else:
+            task = asyncio.create_task(send(client, path, next_body(), recorder, scheduled))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        scheduled += rng.expovariate(qps)
+    if inflight:
+        await asyncio.gather(*inflight)
+
+
+async def run(args):
+    path, next_body = make_payloads(args)
+    limits = httpx.Limits(max_connections=max(args.concurrency or 0, args.max_inflight))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        (await client.get('/health')).raise_for_status()
+        recorder = Recorder(args.interval)
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(args.interval)
+                recorder.report_window()
+
+        report_task = asyncio.create_task(reporter())
+        deadline = time.perf_counter() + args.duration
+        try:
+            if args.qps:
+                await open_loop(client, path, next_body, recorder, args.qps, deadline,
+                                args.max_inflight, args.seed)
+            else:
+                await closed_loop(client, path, next_body, recorder, args.concurrency, deadline)
+        finally:
+            report_task.cancel()
+        return recorder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients (default)")
+    mode.add_argument("--qps", type=float, help="Open-loop arrival rate instead of closed loop")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds per report line")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--model", help="model_name to request (default: server's best model)")
+    parser.add_argument("--pool", type=int, default=5000, help="Distinct listings sampled from the dataset")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Save windows and summary as JSON")
+    args = parser.parse_args(argv)
+
+    load = f"{args.qps} req/s open loop" if args.qps else f"concurrency {args.concurrency}"
+    print(f"{args.endpoint} against {args.url} ({args.model or 'best model'}), {load}, {args.duration:.0f}s")
+    recorder = asyncio.run(run(args))
+    summary = recorder.overall()
+    print("overall " + format_line(summary) + (f"  dropped {summary['dropped']}" if args.qps else ""))
+    if args.output:
+        config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        args.output.write_text(json.dumps(
+            {'config': config, 'summary': summary, 'windows': recorder.windows}, indent=2
+        ))
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
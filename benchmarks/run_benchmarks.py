@@ -0,0 +1,259 @@
+"""
+Performance benchmark suite for the API and the data/model utilities.
+
+Usage:
+  python benchmarks/run_benchmarks.py                        # run, print, save results
+  python benchmarks/run_benchmarks.py --compare              # also check against the baseline
+  python benchmarks/run_benchmarks.py --save-baseline        # make this run the new baseline
+  python benchmarks/run_benchmarks.py --only predict_api --rows 100000
+
+Groups (run all by default):
+  import       startup time of ``import src.api`` in a fresh interpreter (eager and lazy loading)
+  predict_api  single and batch /predict latency through the ASGI app in-process
+  model        raw predict per model in models/ at several batch sizes
+  data         prepare_data and clean throughput on AmesHousing.csv replicated to --rows rows,
+               and prepare_data from that CSV on disk with the pandas and polars engines
+
+Results go to benchmarks/results/latest.json. ``--compare`` flags every metric
+that is worse than benchmarks/baseline.json by more than ``--threshold``
+(default 20%) and exits with status 1, so a CI job can fail the PR. Timings
+are machine-specific: record the baseline on the machine that runs the
+comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+DATASET = ROOT / "docs" / "datasets" / "AmesHousing.csv"
+RESULTS = ROOT / "benchmarks" / "results" / "latest.json"
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+GROUPS = ("import", "predict_api", "model", "data")
+MODEL_BATCH_SIZES = (1, 100, 10_000)
+
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": round(float(value), 6), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def latency_metrics(prefix, samples_ms):
+    samples = np.asarray(samples_ms)
+    return {
+        f"{prefix}.p50": metric(np.percentile(samples, 50), "ms"),
+        f"{prefix}.p95": metric(np.percentile(samples, 95), "ms"),
+        f"{prefix}.mean": metric(samples.mean(), "ms"),
+    }
+
+
+def sample_rows(n, seed=0):
+    """Raw listing rows drawn from the dataset, as the API would receive them"""
+    df = pd.read_csv(DATASET).drop(columns=["Order", "PID", "SalePrice"], errors="ignore")
+    rows = df.sample(n, replace=True, random_state=seed).to_dict("records")
+    # JSON has no NaN: omitted fields are filled with defaults by the API
+    return [{k: v for k, v in row.items() if not pd.isna(v)} for row in rows]
+
+
+def bench_import(repeats):
+    results = {}
+    code = "import time; t = time.perf_counter(); import src.api; print(time.perf_counter() - t)"
+    for mode in ("eager", "lazy"):
+        env = {**os.environ, "MODEL_LOADING": mode, "MODEL_RELOAD_INTERVAL": "0"}
+        times = []
+        for _ in range(repeats):
+            out = subprocess.run(
+                [sys.executable, "-W", "ignore", "-c", code], cwd=ROOT, env=env,
+                capture_output=True, text=True, check=True,
+            ).stdout
+            times.append(float(out.strip().splitlines()[-1]) * 1000)
+        results[f"import.{mode}"] = metric(statistics.median(times), "ms")
+    return results
+
+
+def bench_predict_api(requests, batch_size):
+    import httpx
+
+    # Measure the model path, not the prediction cache
+    os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+    os.environ.setdefault("MODEL_RELOAD_INTERVAL", "0")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from src import api
+    # Per-request INFO logs would be part of the measurement and flood the output
+    logging.disable(logging.INFO)
+
+    rows = sample_rows(max(requests, batch_size))
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            single = []
+            await client.post("/predict", json={"features": rows[0]})  # warm up
+            for row in rows[:requests]:
+                start = time.perf_counter()
+                resp = await client.post("/predict", json={"features": row})
+                single.append((time.perf_counter() - start) * 1000)
+                resp.raise_for_status()
+            batch = []
+            payload = {"instances": rows[:batch_size]}
+            for _ in range(max(3, requests // 20)):
+                start = time.perf_counter()
+                resp = await client.post("/predict/batch", json=payload)
+                batch.append((time.perf_counter() - start) * 1000)
+                resp.raise_for_status()
+            return single, batch
+
+    single, batch = asyncio.run(run())
+    return {
+        **latency_metrics("predict_api.single", single),
+        **latency_metrics(f"predict_api.batch_{batch_size}", batch),
+        f"predict_api.batch_{batch_size}.rows_per_sec": metric(
+            batch_size / (statistics.median(batch) / 1000), "rows/s", higher_is_better=True
+        ),
+    }
+
+
+def bench_models(repeats):
+    from src.model_registry import ModelRegistry
+    from src.reference_stats import load_reference_stats
+
+    defaults = load_reference_stats(ROOT / "models" / "reference_stats.json")["defaults"]
+    registry = ModelRegistry(str(ROOT / "models"), defaults)
+    results = {}
+    df = pd.DataFrame(sample_rows(max(MODEL_BATCH_SIZES), seed=1))
+    for name, entry in registry.load().models.items():
+        X_all, _ = entry["layout"].frame(df)
+        for n in MODEL_BATCH_SIZES:
+            X = X_all[:n]
+            entry["model"].predict(X)  # warm up
+            times = []
+            for _ in range(max(1, repeats // (10 if n >= 10_000 else 1))):
+                start = time.perf_counter()
+                entry["model"].predict(X)
+                times.append((time.perf_counter() - start) * 1000)
+            results[f"model.{name}.batch_{n}"] = metric(statistics.median(times), "ms")
+    return results
+
+
+def bench_data(rows):
+    from clean_data import clean
+    from src.data_preprocessing import prepare_data
+
+    base = pd.read_csv(DATASET)
+    df = pd.concat([base] * -(-rows // len(base)), ignore_index=True).iloc[:rows]
+    results = {}
+    for name, fn in (("prepare_data", prepare_data), ("clean", clean)):
+        data = df.copy()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(data)
+        elapsed = time.perf_counter() - start
+        results[f"data.{name}.rows_per_sec"] = metric(rows / elapsed, "rows/s", higher_is_better=True)
+
+    # End to end from a CSV, parsing included: the polars engine parses it once into memory
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ames.csv"
+        df.to_csv(path, index=False)
+        del df
+        for engine in ("pandas", "polars"):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                prepare_data(pd.read_csv(path) if engine == "pandas" else path, engine=engine)
+            elapsed = time.perf_counter() - start
+            results[f"data.prepare_data_csv_{engine}.rows_per_sec"] = metric(
+                rows / elapsed, "rows/s", higher_is_better=True
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Metrics in both runs that got worse by more than ``threshold`` (a fraction)"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        worse = -change if current["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append((name, base["value"], current["value"], current["unit"], worse))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--repeats", type=int, default=20, help="Repetitions per timing")
+    parser.add_argument("--requests", type=int, default=200, help="Single /predict calls to time")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows for the data benchmarks")
+    parser.add_argument("--output", type=Path, default=RESULTS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against --baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    results = {}
+    if "import" in args.only:
+        results.update(bench_import(max(3, args.repeats // 4)))
+    if "predict_api" in args.only:
+        results.update(bench_predict_api(args.requests, args.batch_size))
+    if "model" in args.only:
+        results.update(bench_models(args.repeats))
+    if "data" in args.only:
+        results.update(bench_data(args.rows))
+
+    for name, m in results.items():
+        print(f"{name:<48}{m['value']:>16,.3f} {m['unit']}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "rows": args.rows,
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Saved results to {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, unit, worse in regressions:
+            print(f"REGRESSION {name}: {before:,.3f} -> {after:,.3f} {unit} ({worse:+.0%} worse)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
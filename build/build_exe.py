@@ -65,6 +65,14 @@ def get_resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+def run_combined():
+    """Serve the frontend and the API from one process on one port"""
+    # frontend/ and src/ are unpacked side by side under the resource root
+    sys.path.insert(0, get_resource_path(''))
+    from frontend.combined import main as combined_main
+
+    combined_main(["--port", "8000"])
+
 def run_backend():
     """Run the backend API server"""
     try:
@@ -102,27 +110,33 @@ def open_browser():
         logger.warning(f"Could not open browser automatically: {e}")
         print(f"\\nPlease open your web browser and navigate to: http://127.0.0.1:8080")
 
+def run_separate():
+    """Previous layout: API on 8000 and frontend on 8080, each with its own server"""
+    print("Backend API: http://127.0.0.1:8000")
+    print("Frontend:    http://127.0.0.1:8080")
+    # Start backend in a separate thread
+    backend_thread = threading.Thread(target=run_backend, daemon=True)
+    backend_thread.start()
+
+    # Start browser opener in a separate thread
+    browser_thread = threading.Thread(target=open_browser, daemon=True)
+    browser_thread.start()
+
+    # Run frontend in the main thread
+    run_frontend()
+
 def main():
     """Main application entry point"""
     print("=" * 60)
     print("  House Price Prediction - Standalone Application")
     print("=" * 60)
-    print("Starting servers...")
-    print("Backend API: http://127.0.0.1:8000")
-    print("Frontend:    http://127.0.0.1:8080")
-    print("=" * 60)
     
     try:
-        # Start backend in a separate thread
-        backend_thread = threading.Thread(target=run_backend, daemon=True)
-        backend_thread.start()
-        
-        # Start browser opener in a separate thread
-        browser_thread = threading.Thread(target=open_browser, daemon=True)
-        browser_thread.start()
-        
-        # Run frontend in the main thread
-        run_frontend()
+        # One server by default; --separate-servers restores the two-port layout
+        if "--separate-servers" in sys.argv[1:]:
+            run_separate()
+        else:
+            run_combined()
         
     except KeyboardInterrupt:
         print("\\nApplication shutting down...")
@@ -150,6 +164,7 @@ block_cipher = None
 
 # Project root directory
 import os
+from PyInstaller.utils.hooks import collect_data_files, collect_dynamic_libs
 project_root = r"{PROJECT_ROOT}"
 
 # Get all Python files and data files
@@ -176,23 +191,37 @@ if os.path.exists(models_dir):
             rel_root = os.path.relpath(root, project_root)
             model_files.append((os.path.join(root, file), rel_root))
 
-# Data files
+# Data files: the raw CSV is only read when models/reference_stats.json is
+# missing, so it is left out of the bundle (and the unpack at every start)
 data_files = []
 data_dir = os.path.join(project_root, 'data')
-if os.path.exists(data_dir):
+if os.path.exists(data_dir) and not os.path.exists(os.path.join(models_dir, 'reference_stats.json')):
     for root, dirs, files in os.walk(data_dir):
         for file in files:
             if file.endswith('.csv'):
                 rel_root = os.path.relpath(root, project_root)
                 data_files.append((os.path.join(root, file), rel_root))
 
+# xgboost loads lib/libxgboost and reads its VERSION file at import; no
+# PyInstaller hook collects them
+xgboost_files = collect_data_files('xgboost')
+
 # Combine all data files
-all_datas = src_files + frontend_files + model_files + data_files
+all_datas = src_files + frontend_files + model_files + data_files + xgboost_files
+
+# src/ and frontend/ are imported from the unpacked files at run time, which
+# the analysis can't see; src is also analysed as a package so everything its
+# modules import is bundled
+src_modules = sorted(
+    'src.' + os.path.splitext(file)[0]
+    for file in os.listdir(os.path.join(project_root, 'src'))
+    if file.endswith('.py') and file != '__init__.py'
+)
 
 a = Analysis(
     ['house_price_app.py'],
     pathex=[project_root],
-    binaries=[],
+    binaries=collect_dynamic_libs('xgboost'),
     datas=all_datas,
     hiddenimports=[
         'uvicorn',
@@ -208,6 +237,8 @@ a = Analysis(
         'fastapi.responses',
         'fastapi.middleware',
         'fastapi.middleware.cors',
+        'fastapi.middleware.gzip',
+        'fastapi.exceptions',
         'pandas',
         'numpy',
         'sklearn',
@@ -217,20 +248,46 @@ a = Analysis(
         'joblib',
         'pydantic',
         'xgboost',
-        'matplotlib',
-        'seaborn',
         'starlette',
         'starlette.staticfiles',
         'starlette.responses',
-    ],
+        'starlette.routing',
+        'starlette.applications',
+        'starlette.datastructures',
+        'starlette.requests',
+        'starlette.middleware.gzip',
+        'orjson',
+        # Standard library modules only imported by src/ and frontend/
+        'cProfile',
+        'pstats',
+        'gzip',
+        'mimetypes',
+        'bisect',
+        'concurrent.futures',
+        'contextvars',
+        'hashlib',
+        'marshal',
+        'multiprocessing',
+        'signal',
+        'tempfile',
+        'webbrowser',
+    ] + src_modules,
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
+    # Plotting, notebook and test tooling is only used by the training
+    # scripts; leaving it out shrinks the bundle that is unpacked on every start
     excludes=[
         'tkinter',
-        'matplotlib.backends._tkagg',
-        'PIL.ImageTk',
-        'PIL._imagingtk',
+        'matplotlib',
+        'seaborn',
+        'PIL',
+        'IPython',
+        'jupyter_client',
+        'notebook',
+        'pytest',
+        'polars',
+        'pyarrow',
     ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
@@ -299,9 +356,8 @@ def build_executable():
 ## How to Run
 
 1. Double-click `HousePricePrediction.exe`
-2. Wait for the servers to start (may take 10-30 seconds on first run)
-3. Your default web browser will automatically open the application
-4. If the browser doesn't open automatically, navigate to: http://127.0.0.1:8080
+2. Your default web browser opens the application as soon as the server is listening
+3. If the browser doesn't open automatically, navigate to: http://127.0.0.1:8000
 
 ## Features
 
@@ -321,12 +377,12 @@ def build_executable():
 
 1. **Antivirus Warning**: Some antivirus software may flag the executable. This is a false positive due to PyInstaller packaging.
 2. **Slow Startup**: First launch may be slow as files are extracted. Subsequent launches will be faster.
-3. **Port Conflicts**: If ports 8000 or 8080 are in use, close other applications using these ports.
+3. **Port Conflicts**: If port 8000 is in use, close the application using it.
 
 ## Technical Details
 
-- Backend API: FastAPI on port 8000
-- Frontend: FastAPI static files on port 8080
+- Dashboard and API: one server on port 8000 (API docs at /docs)
+- Run with `--separate-servers` for the API on 8000 and the dashboard on 8080
 - Models: Random Forest and XGBoost (pre-trained)
 - Data: Ames Housing Dataset
 """
@@ -416,7 +472,7 @@ def main():
             print("  - HousePricePrediction.exe")
             print("  - README.txt")
             print("\\nTo test: Double-click HousePricePrediction.exe")
-            print("The application will start both servers and open in your browser.")
+            print("The application will start the server and open in your browser.")
             return True
         else:
             print("\\n" + "=" * 50)
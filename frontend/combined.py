@@ -0,0 +1,151 @@
+"""
+Frontend and API served by one ASGI app on one port.
+
+The standalone executable (build/build_exe.py) uses this instead of running
+two uvicorn servers. That gives one event loop and one port. index.html is
+rewritten to call the API on its own origin, so no CORS preflights are
+needed. The API is imported, and its models loaded, in a worker thread
+while the server starts, so the page appears while pandas, xgboost and
+sklearn are still being imported. The dashboard retries the API's 503
+responses until the models are ready.
+
+  python frontend/combined.py [--host 127.0.0.1] [--port 8000] [--no-browser]
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import socket
+import sys
+import threading
+import time
+import webbrowser
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+
+frontend_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(frontend_dir)
+
+try:
+    from .routes import frontend_routes
+except ImportError:  # running as a script: python frontend/combined.py
+    from routes import frontend_routes
+
+
+class DeferredAPI:
+    """ASGI app that forwards to ``src.api`` once it has been imported.
+
+    Importing the API (pandas, fastapi) and loading its models (xgboost,
+    sklearn) takes a couple of seconds, so it starts in a worker thread
+    before the server binds its port. Until it finishes, API paths answer
+    503 with ``Retry-After``, like a server that is still loading its models.
+    If the import or the API's startup fails, they answer 500 with the error
+    instead of 503 forever.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.error = None
+        self._loading = None
+
+    @staticmethod
+    def import_api():
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        from src.api import app
+
+        return app
+
+    def start(self):
+        future = self._loading = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(self.import_api())
+            except Exception as e:
+                print(f"Failed to start the API: {e}")
+                self.error = e
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="api-import", daemon=True).start()
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        if self._loading is None:
+            self.start()
+        async with AsyncExitStack() as stack:
+            async def serve_when_imported():
+                api_app = await asyncio.wrap_future(self._loading)
+                try:
+                    # The API's own lifespan starts the reload watcher and stops its executor
+                    await stack.enter_async_context(api_app.router.lifespan_context(api_app))
+                except Exception as e:
+                    print(f"Failed to start the API: {e}")
+                    self.error = e
+                    raise
+                self.app = api_app
+
+            task = asyncio.create_task(serve_when_imported())
+            try:
+                yield
+            finally:
+                if not task.done():
+                    task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def __call__(self, scope, receive, send):
+        if self.app is not None:
+            await self.app(scope, receive, send)
+        elif scope['type'] == 'http' and self.error is not None:
+            response = JSONResponse({'detail': f'API failed to start: {self.error}'}, status_code=500)
+            await response(scope, receive, send)
+        elif scope['type'] == 'http':
+            response = JSONResponse({'detail': 'API is starting'}, status_code=503, headers={'Retry-After': '1'})
+            await response(scope, receive, send)
+
+
+def create_app():
+    """The dashboard at ``/`` and ``/static``; every other path goes to the API"""
+    api = DeferredAPI()
+    # Import and model loading overlap with uvicorn's own startup
+    api.start()
+    return Starlette(routes=frontend_routes(api_base='') + [Mount('', app=api)], lifespan=api.lifespan)
+
+
+def open_browser_when_listening(url, host, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                break
+        except OSError:
+            time.sleep(0.05)
+    try:
+        webbrowser.open(url)
+    except Exception as e:
+        print(f"Could not open a browser ({e}); navigate to {url}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard and the API on one port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-browser", action="store_true", help="Don't open the dashboard in a browser")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    url = f"http://{args.host}:{args.port}"
+    print(f"House Price Prediction: {url} (API docs at {url}/docs)")
+    if not args.no_browser:
+        threading.Thread(
+            target=open_browser_when_listening, args=(url, args.host, args.port), daemon=True
+        ).start()
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
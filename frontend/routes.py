@@ -0,0 +1,90 @@
+"""
+Routes serving the dashboard page and its static assets.
+
+Kept free of FastAPI so the combined server (combined.py) can start
+listening before the heavier API stack is imported.
+"""
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, HTMLResponse, Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+try:
+    from .assets import build_bundle, set_api_base
+except ImportError:  # running as a script or from build_exe: python frontend/server.py
+    from assets import build_bundle, set_api_base
+
+frontend_dir = os.path.dirname(os.path.abspath(__file__))
+static_dir = os.path.join(frontend_dir, "static")
+
+# 'production' serves content-hashed, precompressed copies of the static
+# assets with immutable caching (see assets.py); 'dev' serves the files as
+# they are on disk, so edits show up on reload
+FRONTEND_MODE = os.environ.get('FRONTEND_MODE', 'production').lower()
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def asset_response(headers, asset, cache_control):
+    """Serve a bundle Asset, honouring If-None-Match and Accept-Encoding"""
+    coding, body = asset.choose(headers.get('accept-encoding'))
+    # Each encoding is its own representation and gets its own strong tag
+    etag = asset.etag if coding == 'identity' else f'{asset.etag[:-1]}-{coding}"'
+    response_headers = {'ETag': etag, 'Cache-Control': cache_control}
+    if len(asset.encodings) > 1:
+        response_headers['Vary'] = 'Accept-Encoding'
+    tags = {t.strip().removeprefix('W/') for t in headers.get('if-none-match', '').split(',')}
+    if etag in tags or '*' in tags:
+        return Response(status_code=304, headers=response_headers)
+    if coding != 'identity':
+        response_headers['Content-Encoding'] = coding
+    return Response(body, media_type=asset.media_type, headers=response_headers)
+
+
+class BundleStaticFiles(StaticFiles):
+    """StaticFiles that answers hashed bundle names from memory with immutable caching.
+
+    Unhashed names (old links, files outside the bundle) still come from
+    disk but must be revalidated on every use.
+    """
+
+    def __init__(self, assets, **kwargs):
+        super().__init__(**kwargs)
+        self.assets = assets
+
+    async def get_response(self, path, scope):
+        asset = self.assets.get(path)
+        if asset is not None:
+            return asset_response(Headers(scope=scope), asset, IMMUTABLE)
+        response = await super().get_response(path, scope)
+        response.headers.setdefault('Cache-Control', 'no-cache')
+        return response
+
+
+def frontend_routes(mode=FRONTEND_MODE, api_base=None):
+    """Routes for ``/`` and ``/static``.
+
+    ``api_base`` overrides the API origin written into index.html ('' when
+    the API is served from the same origin, see combined.py).
+    """
+    if mode == 'dev':
+        async def serve_index(request):
+            """Serve the main index.html file"""
+            path = os.path.join(frontend_dir, "index.html")
+            if api_base is None:
+                return FileResponse(path)
+            with open(path, encoding='utf-8') as f:
+                return HTMLResponse(set_api_base(f.read(), api_base))
+
+        static_app = StaticFiles(directory=static_dir)
+    else:
+        # Fingerprinted and compressed once at startup
+        index_asset, bundle_assets, _ = build_bundle(frontend_dir, api_base)
+
+        async def serve_index(request):
+            """Serve index.html pointing at the hashed assets; revalidated by ETag on every load"""
+            return asset_response(request.headers, index_asset, "no-cache")
+
+        static_app = BundleStaticFiles(bundle_assets, directory=static_dir)
+    return [Route("/", serve_index, methods=["GET"]), Mount("/static", static_app, name="static")]
@@ -1,8 +1,10 @@
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-import os
+
+try:
+    from .routes import frontend_routes
+except ImportError:  # running as a script or from build_exe: python frontend/server.py
+    from routes import frontend_routes
 
 # Create FastAPI app for serving frontend
 frontend_app = FastAPI(title="House Price Predictor Frontend")
@@ -16,16 +18,8 @@ frontend_app.add_middleware(
     allow_headers=["*"],
 )
 
-# Get the directory of this file
-frontend_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Mount static files
-frontend_app.mount("/static", StaticFiles(directory=os.path.join(frontend_dir, "static")), name="static")
-
-@frontend_app.get("/")
-async def serve_index():
-    """Serve the main index.html file"""
-    return FileResponse(os.path.join(frontend_dir, "index.html"))
+# Hashed, precompressed assets unless FRONTEND_MODE=dev (see routes.py)
+frontend_app.router.routes.extend(frontend_routes())
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,16 @@
-// Configuration
-const API_BASE_URL = 'http://localhost:8000';
+// Configuration: the API origin comes from index.html (empty when the
+// frontend and the API share one server, see frontend/combined.py)
+const API_BASE_URL = document.querySelector('meta[name="api-base"]')?.content ?? 'http://localhost:8000';
+
+// fetch() against the API, retrying while it is still loading its models (503)
+async function fetchApi(path, options = {}, attempts = 60) {
+    for (let attempt = 1; ; attempt++) {
+        const response = await fetch(`${API_BASE_URL}${path}`, options);
+        if (response.status !== 503 || attempt >= attempts) return response;
+        const wait = Number(response.headers.get('Retry-After')) || 1;
+        await new Promise(resolve => setTimeout(resolve, wait * 1000));
+    }
+}
 
 // Global variables
 let featuresData = null;
@@ -22,7 +33,7 @@ document.addEventListener('DOMContentLoaded', function() {
 // Load features from API
 async function loadFeatures() {
     try {
-        const response = await fetch(`${API_BASE_URL}/features`);
+        const response = await fetchApi('/features');
         if (!response.ok) {
             throw new Error('Failed to load features');
         }
@@ -39,7 +50,7 @@ async function loadFeatures() {
 // Load insights for visualizations
 async function loadInsights() {
     try {
-        const resp = await fetch(`${API_BASE_URL}/insights`);
+        const resp = await fetchApi('/insights');
         if (!resp.ok) return;
         const insights = await resp.json();
         renderInsights(insights);
@@ -241,7 +252,7 @@ async function makePrediction() {
     setLoadingState(true);
     
     try {
-        const response = await fetch(`${API_BASE_URL}/predict`, {
+        const response = await fetchApi('/predict', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
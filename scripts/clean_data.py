@@ -2,50 +2,79 @@
 Clean the raw Ames Housing dataset and save a cleaned CSV for modeling and demos.
 
 Usage (PowerShell):
-  .venv\Scripts\python.exe scripts/clean_data.py
+  .venv\Scripts\python.exe scripts/clean_data.py [--engine polars [--stream]] [--input path.csv]
+
+--engine polars parses the CSV once into a Polars frame held in memory and
+streams the cleaned rows to disk (src/lazy_engine.py); the outputs are the
+same as with pandas. With --stream the CSV is scanned from disk by every
+query instead (scan_csv): lower peak memory, one parse per query.
 
 Input: data/AmesHousing.csv
 Output: docs/datasets/ames_clean.csv
+        models/reference_stats.json (defaults, dtypes, quantiles and SalePrice
+        histogram loaded by the API instead of re-reading the raw CSV)
+        models/preprocessor.json (fitted outlier bounds, fill values, schema and
+        categories, see src/preprocessor.py)
 """
 from __future__ import annotations
+import argparse
+import sys
 import pandas as pd
 from pathlib import Path
 
-RAW = Path(__file__).resolve().parents[1] / "data" / "AmesHousing.csv"
-OUT = Path(__file__).resolve().parents[1] / "docs" / "datasets" / "ames_clean.csv"
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
+from src.preprocessor import Preprocessor  # noqa: E402
+from src.reference_stats import compute_reference_stats, save_reference_stats  # noqa: E402
 
-def clean(df: pd.DataFrame) -> pd.DataFrame:
-    # Drop id-like columns if present
-    for col in ("PID", "Order", "Id"):
-        if col in df.columns:
-            df = df.drop(columns=[col])
+RAW = ROOT / "data" / "AmesHousing.csv"
+OUT = ROOT / "docs" / "datasets" / "ames_clean.csv"
+STATS_OUT = ROOT / "models" / "reference_stats.json"
+PREPROCESSOR_OUT = ROOT / "models" / "preprocessor.json"
 
-    # Fill numeric with median, categorical with mode
-    num_cols = df.select_dtypes(include=["int64", "float64"]).columns
-    cat_cols = df.select_dtypes(include=["object"]).columns
 
-    for c in num_cols:
-        if df[c].isna().any():
-            df[c] = df[c].fillna(df[c].median())
-    for c in cat_cols:
-        if df[c].isna().any():
-            df[c] = df[c].fillna(df[c].mode().iloc[0])
+def clean(df: pd.DataFrame, preprocessor: Preprocessor | None = None) -> pd.DataFrame:
+    """Trim SalePrice outliers, then impute with the fitted medians and modes.
 
-    # Basic outlier trim on SalePrice if present
-    if "SalePrice" in df.columns:
-        s = df["SalePrice"]
-        m, sd = s.mean(), s.std()
-        df = df[(s >= m - 2.5 * sd) & (s <= m + 2.5 * sd)]
+    This is the same order the training notebook uses (``prepare_data``); a
+    ``preprocessor`` fitted elsewhere is reused as is.
+    """
+    if preprocessor is None:
+        preprocessor = Preprocessor.fit(df)
+    return preprocessor.transform(preprocessor.filter_outliers(df))
 
-    return df
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Clean the raw Ames Housing dataset")
+    parser.add_argument("--engine", choices=("pandas", "polars"), default="pandas")
+    parser.add_argument("--input", type=Path, default=RAW)
+    parser.add_argument("--stream", action="store_true", help="With --engine polars, don't hold the CSV in memory")
+    args = parser.parse_args(argv)
 
-def main() -> None:
-    df = pd.read_csv(RAW)
-    cleaned = clean(df)
     OUT.parent.mkdir(parents=True, exist_ok=True)
-    cleaned.to_csv(OUT, index=False)
+    if args.engine == "polars":
+        from src import lazy_engine
+
+        # Learned once with aggregate queries; the cleaned rows are streamed
+        # to the output file and never held in memory as a whole
+        source = lazy_engine.scan(args.input) if args.stream else lazy_engine.load(args.input)
+        preprocessor = lazy_engine.fit(source)
+        stats = lazy_engine.reference_stats(source, source_name=args.input.name, preprocessor=preprocessor)
+    else:
+        df = pd.read_csv(args.input)
+        # Learned once: the API defaults, the imputation of the cleaned CSV and
+        # the encoder all come from the same fit
+        preprocessor = Preprocessor.fit(df)
+        stats = compute_reference_stats(df, source=args.input.name, preprocessor=preprocessor)
+    preprocessor.save(PREPROCESSOR_OUT)
+    print(f"Saved fitted preprocessing to {PREPROCESSOR_OUT}")
+    save_reference_stats(stats, STATS_OUT)
+    print(f"Saved reference statistics to {STATS_OUT}")
+    if args.engine == "polars":
+        lazy_engine.sink_csv(lazy_engine.transform(source, preprocessor), OUT)
+    else:
+        clean(df, preprocessor).to_csv(OUT, index=False)
     print(f"Saved cleaned dataset to {OUT}")
 
 
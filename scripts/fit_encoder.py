@@ -0,0 +1,48 @@
+"""
+Fit the categorical encoder on the raw Ames Housing dataset and save it next to
+each model's metadata so the API can accept raw values like Neighborhood="NAmes".
+
+Usage (PowerShell):
+  .venv\Scripts\python.exe scripts/fit_encoder.py [path\to\AmesHousing.csv]
+
+Input: data/AmesHousing.csv (or the path given as first argument)
+Output: models/<model>_encoder.joblib for every models/<model>_metadata.joblib
+"""
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.categorical_encoder import CategoricalEncoder  # noqa: E402
+from src.preprocessor import Preprocessor  # noqa: E402
+
+RAW = ROOT / "data" / "AmesHousing.csv"
+MODELS = ROOT / "models"
+
+
+def fit(df: pd.DataFrame) -> CategoricalEncoder:
+    # Categories come from the shared preprocessing fit, after the same
+    # outlier trim as training, so rare categories line up with the dummies
+    return Preprocessor.fit(df).encoder
+
+
+def main() -> None:
+    raw = Path(sys.argv[1]) if len(sys.argv) > 1 else RAW
+    encoder = fit(pd.read_csv(raw))
+    for metadata_path in sorted(MODELS.glob("*_metadata.joblib")):
+        model_name = metadata_path.name.replace("_metadata.joblib", "")
+        features = set(joblib.load(metadata_path)["features"])
+        dummies = {n for c in encoder.columns for n in encoder.dummy_columns(c) if n}
+        uncovered = [f for f in features if "_" in f and f not in dummies]
+        out = MODELS / f"{model_name}_encoder.joblib"
+        encoder.save(out)
+        print(f"Saved {out} ({len(encoder.columns)} columns, {len(uncovered)} unmatched dummy features)")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,8 @@ def install_requirements():
         'jupyter',
         'fastapi',
         'uvicorn',
-        'pydantic'
+        'pydantic',
+        'orjson'
     ]
     
     python_path = get_python_path()
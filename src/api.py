@@ -1,18 +1,74 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-import joblib
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
+import concurrent.futures
 import os
 import pandas as pd
 import numpy as np
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import Dict, List, Optional, Any
 import time
 import logging
+import threading
+import warnings
+
+from contextlib import asynccontextmanager
+
+try:
+    from . import columnar
+    from .columnar import ARROW_FILE, ARROW_STREAM, ARROW_TYPES, accepts_arrow, media_type
+    from .inference_executor import (
+        ExecutorSaturated, InferenceExecutor, default_model_threads,
+    )
+    from .metrics import BATCH_SIZE_BUCKETS, MetricsRegistry
+    from .micro_batching import MicroBatcher
+    from .model_registry import ModelRegistry
+    from .ndjson_stream import LineError, NDJSONStreamingResponse, iter_ndjson
+    from .payload_cache import CachedPayload
+    from .prediction_cache import PredictionCache
+    from .profiling import ProfileSampler, StageTimer, current_timer, mark, profile_call, profile_text, profiling
+    from .responses import FastJSONResponse, dumps
+    from .reference_stats import compute_reference_stats, load_reference_stats, serving_defaults
+    from .tree_engine import FlatEnsemble
+except ImportError:  # running as a script: python src/api.py
+    import columnar
+    from columnar import ARROW_FILE, ARROW_STREAM, ARROW_TYPES, accepts_arrow, media_type
+    from inference_executor import (
+        ExecutorSaturated, InferenceExecutor, default_model_threads,
+    )
+    from metrics import BATCH_SIZE_BUCKETS, MetricsRegistry
+    from micro_batching import MicroBatcher
+    from model_registry import ModelRegistry
+    from ndjson_stream import LineError, NDJSONStreamingResponse, iter_ndjson
+    from payload_cache import CachedPayload
+    from prediction_cache import PredictionCache
+    from profiling import ProfileSampler, StageTimer, current_timer, mark, profile_call, profile_text, profiling
+    from responses import FastJSONResponse, dumps
+    from reference_stats import compute_reference_stats, load_reference_stats, serving_defaults
+    from tree_engine import FlatEnsemble
+
+# Models fitted on DataFrames warn when scored with the (already ordered) float32 layout
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_LOADING == 'background':
+        start_loading_artifacts()
+    # Pick up newly trained models from models/ without a restart
+    registry.start_watching(MODEL_RELOAD_INTERVAL)
+    yield
+    registry.stop_watching()
+    inference_executor.shutdown()
 
 app = FastAPI(
     title="House Price Prediction API",
     description="API for predicting house prices using trained models",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware
@@ -28,64 +84,216 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress responses larger than GZIP_MIN_SIZE bytes for clients that accept gzip (0 disables)
+GZIP_MIN_SIZE = int(os.environ.get('GZIP_MIN_SIZE', '1024'))
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
-# Load models
-models = {}
+# Upper bound on rows accepted by /predict/batch (override with MAX_BATCH_SIZE)
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '10000'))
+# Body bytes allowed per batch row; larger bodies get a 413 before they are parsed
+MAX_BATCH_ROW_BYTES = int(os.environ.get('MAX_BATCH_ROW_BYTES', '8192'))
+# Rows per model call and max bytes per line for POST /predict/stream
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', '1000'))
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', str(1 << 20)))
+# Seconds between checks of models/ for redeployed artifacts (0 disables hot reload)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', '5'))
+# When to load models and reference data: 'eager' at import, 'lazy' on first
+# request, or 'background' in a thread once the server is listening
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'eager').lower()
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '0') == '1'
 models_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
+REFERENCE_STATS_PATH = os.environ.get(
+    'REFERENCE_STATS_PATH', os.path.join(models_dir, 'reference_stats.json')
+)
+PREPROCESSOR_PATH = os.environ.get('PREPROCESSOR_PATH', os.path.join(models_dir, 'preprocessor.json'))
 
-# Load reference dataset for defaults
-try:
-    data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'amesHousing.csv')
-    reference_data = pd.read_csv(data_path)
-    # Drop ID columns
-    if 'PID' in reference_data.columns:
-        reference_data = reference_data.drop(['PID', 'Order'], axis=1)
-    
-    # Calculate defaults for each column
-    feature_defaults = {}
-    
-    # For numerical columns, use median
-    numerical_cols = reference_data.select_dtypes(include=['int64', 'float64']).columns
-    for col in numerical_cols:
-        if col != 'SalePrice':  # Skip the target variable
-            feature_defaults[col] = float(reference_data[col].median())
-    
-    # For categorical columns, use mode
-    categorical_cols = reference_data.select_dtypes(include=['object']).columns
-    for col in categorical_cols:
-        feature_defaults[col] = reference_data[col].mode()[0]
-    
-    # Pre-compute SalePrice histogram for insights if available
-    saleprice_hist = None
-    if 'SalePrice' in reference_data.columns:
-        counts, bin_edges = np.histogram(reference_data['SalePrice'].dropna(), bins=20)
-        centers = (bin_edges[:-1] + bin_edges[1:]) / 2.0
-        saleprice_hist = {
-            'counts': counts.astype(int).tolist(),
-            'bin_edges': bin_edges.astype(float).tolist(),
-            'centers': centers.astype(float).tolist(),
-        }
-    print("Feature defaults calculated from reference data")
-except Exception as e:
-    print(f"Error loading reference data for defaults: {str(e)}")
-    feature_defaults = {}  # Empty defaults if reference data can't be loaded
-    saleprice_hist = None
+# Filled in place by load_reference_data(); layouts keep a reference to this dict
+feature_defaults: Dict[str, Any] = {}
+saleprice_hist = None
 
-# Load trained models
-try:
-    for file in os.listdir(models_dir):
-        if file.endswith('.joblib') and not file.endswith('_metadata.joblib'):
-            model_name = file.replace('.joblib', '')
-            model_path = os.path.join(models_dir, file)
-            metadata_path = os.path.join(models_dir, f"{model_name}_metadata.joblib")
-            
-            models[model_name] = {
-                'model': joblib.load(model_path),
-                'metadata': joblib.load(metadata_path)
-            }
-    print(f"Loaded {len(models)} models from {models_dir}")
-except Exception as e:
-    print(f"Error loading models: {str(e)}")
+def load_reference_data():
+    """Load feature defaults and the SalePrice histogram.
+
+    Reads the precomputed statistics artifact written by scripts/clean_data.py
+    and only falls back to profiling the raw CSV when it is missing. When the
+    fitted preprocessor is saved next to it, its fill values are the defaults,
+    so omitted features are filled exactly as training imputed them.
+    """
+    global saleprice_hist
+    try:
+        try:
+            stats = load_reference_stats(REFERENCE_STATS_PATH)
+            print(f"Reference statistics loaded from {REFERENCE_STATS_PATH}")
+        except (OSError, ValueError) as e:
+            print(f"Reference statistics unavailable ({e}); profiling raw dataset")
+            data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'amesHousing.csv')
+            stats = compute_reference_stats(pd.read_csv(data_path), source=data_path)
+            print("Feature defaults calculated from reference data")
+        feature_defaults.update(serving_defaults(stats, PREPROCESSOR_PATH))
+        saleprice_hist = stats['saleprice_histogram']
+    except Exception as e:
+        print(f"Error loading reference data for defaults: {str(e)}")
+        feature_defaults.clear()  # Empty defaults if reference data can't be loaded
+        saleprice_hist = None
+
+# Inference runs in a bounded thread pool so /health and /metrics never wait
+# behind a slow predict; each call's model threads are capped so that
+# INFERENCE_WORKERS x INFERENCE_MODEL_THREADS does not oversubscribe the CPU
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', str(min(4, os.cpu_count() or 1))))
+INFERENCE_MODEL_THREADS = int(os.environ.get(
+    'INFERENCE_MODEL_THREADS', str(default_model_threads(INFERENCE_WORKERS))
+))
+# How each model scores rows: 'native' (model.predict), 'numpy' (flattened
+# trees, see tree_engine.py) or 'inplace' (XGBoost Booster.inplace_predict,
+# see xgboost_backend.py); per-model overrides as "random_forest=numpy,..."
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'native')
+INFERENCE_ENGINE_OVERRIDES = dict(
+    item.split('=', 1) for item in os.environ.get('INFERENCE_ENGINE_OVERRIDES', '').split(',') if '=' in item
+)
+# The numpy engine wins on small batches only; larger ones use native predict
+NUMPY_ENGINE_MAX_ROWS = int(os.environ.get('NUMPY_ENGINE_MAX_ROWS', '32'))
+inference_executor = InferenceExecutor(
+    max_workers=INFERENCE_WORKERS,
+    max_queue=int(os.environ.get('INFERENCE_QUEUE_LIMIT', '64')),
+)
+
+# Trained models; MODEL_MMAP=1 memory-maps the numpy arrays inside uncompressed joblib files
+registry = ModelRegistry(
+    models_dir,
+    feature_defaults,
+    mmap_mode='r' if MODEL_MMAP else None,
+    model_threads=INFERENCE_MODEL_THREADS,
+    engine=INFERENCE_ENGINE,
+    engine_overrides=INFERENCE_ENGINE_OVERRIDES,
+)
+artifacts_ready = threading.Event()
+_artifacts_lock = threading.Lock()
+_loader_lock = threading.Lock()
+
+def load_artifacts():
+    """Load reference defaults and models once; safe to call from several threads"""
+    with _artifacts_lock:
+        if artifacts_ready.is_set():
+            return
+        start = time.perf_counter()
+        load_reference_data()
+        try:
+            registry.load()
+            print(f"Loaded {len(registry.models)} models from {models_dir}")
+        except Exception as e:
+            print(f"Error loading models: {str(e)}")
+        artifacts_ready.set()
+        logger.info("Artifacts loaded in %.0fms", (time.perf_counter() - start) * 1000)
+
+_artifacts_loading = None
+
+def start_loading_artifacts():
+    """Run load_artifacts() once in a worker thread; returns a future set when it finishes"""
+    global _artifacts_loading
+    with _loader_lock:
+        if _artifacts_loading is None:
+            future = _artifacts_loading = concurrent.futures.Future()
+
+            def run():
+                try:
+                    load_artifacts()
+                    future.set_result(None)
+                except BaseException as e:
+                    future.set_exception(e)
+
+            threading.Thread(target=run, name="artifact-loader", daemon=True).start()
+        return _artifacts_loading
+
+# Repeated quotes for the same house are served from memory (PREDICTION_CACHE_SIZE=0 disables)
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', '10000')),
+    max_bytes=int(os.environ.get('PREDICTION_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', '300')),
+)
+
+# Concurrent single /predict calls are merged into one predict per model
+# (MICRO_BATCH_MAX_SIZE=1 disables)
+micro_batcher = MicroBatcher(
+    max_batch_size=int(os.environ.get('MICRO_BATCH_MAX_SIZE', '32')),
+    max_wait=float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', '2')) / 1000.0,
+    runner=inference_executor.run,
+)
+
+def timed_predict(model_info, predict):
+    """Wrap ``predict`` to record model-only latency and rows per call"""
+    name = model_info['name']
+    # Captured on the event loop; run() executes in an inference thread
+    timer = current_timer.get()
+
+    def run(X):
+        start = time.perf_counter()
+        predictions = profile_call(timer, predict, X)
+        INFERENCE_SECONDS.observe(time.perf_counter() - start, model=name)
+        INFERENCE_BATCH_ROWS.observe(len(X), model=name)
+        return predictions
+
+    return run
+
+async def score_rows(model_info, X, wait=False):
+    """Predict every row of X, answering repeats from the prediction cache.
+
+    Cache keys combine the model version with the fully defaulted feature
+    row; only the misses reach the model. A lone missed row is handed to the
+    micro-batcher so it can share a predict call with concurrent requests;
+    larger sets of misses already form a batch and are predicted directly.
+    With ``wait=True`` a full inference queue is waited out instead of
+    raising ``ExecutorSaturated``. A request sampled for profiling skips the
+    micro-batcher so its profile holds only its own model call.
+    """
+    model = model_info['model']
+    engine = model_info.get('engine')
+    keys = None
+    todo = list(range(len(X)))
+    out = np.empty(len(X), dtype=float)
+    if prediction_cache.enabled:
+        keys = [PredictionCache.key(model_info['version'], row) for row in X]
+        todo = []
+        for i, key in enumerate(keys):
+            value = prediction_cache.get(key)
+            if value is None:
+                todo.append(i)
+            else:
+                out[i] = value
+        mark('cache')
+    if len(todo) == 1 and micro_batcher.enabled and not wait and not profiling(current_timer.get()):
+        predict = timed_predict(model_info, engine.predict if engine is not None else model.predict)
+        out[todo[0]] = await micro_batcher.submit(model_info['version'], predict, X[todo[0]])
+    elif todo:
+        use_engine = engine is not None and (
+            not isinstance(engine, FlatEnsemble) or len(todo) <= NUMPY_ENGINE_MAX_ROWS
+        )
+        predict = timed_predict(model_info, engine.predict if use_engine else model.predict)
+        out[todo] = await inference_executor.run(predict, X[todo], wait=wait)
+    mark('predict')
+    if keys is not None:
+        for i in todo:
+            prediction_cache.put(keys[i], float(out[i]))
+    return out
+
+async def ready_snapshot():
+    """Registry snapshot for request handlers.
+
+    In lazy mode the first caller starts loading the artifacts in a worker
+    thread and waits for it without blocking the event loop, so /health and
+    other requests keep being served. In background mode requests arriving
+    before loading finishes get a 503 they can retry.
+    """
+    if not artifacts_ready.is_set():
+        if MODEL_LOADING == 'lazy':
+            await asyncio.wrap_future(start_loading_artifacts())
+        else:
+            raise HTTPException(
+                status_code=503,
+                detail="Models are still loading",
+                headers={"Retry-After": "1"},
+            )
+    return registry.snapshot
 
 class PredictionRequest(BaseModel):
     features: Dict[str, Any]
@@ -93,15 +301,58 @@ class PredictionRequest(BaseModel):
 
 class PredictionResponse(BaseModel):
     predicted_price: float
-    model_used: str
-    confidence_metrics: Dict[str, Any]
-    features_used: Dict[str, Any]
-    missing_features: List[str]
+    # Omitted when not selected with ?fields=
+    model_used: Optional[str] = None
+    confidence_metrics: Optional[Dict[str, Any]] = None
+    features_used: Optional[Dict[str, Any]] = None
+    missing_features: Optional[List[str]] = None
+    # Per-stage milliseconds, only with ?debug=true
+    timings: Optional[Dict[str, float]] = None
+
+class BatchPredictionRequest(BaseModel):
+    instances: List[Dict[str, Any]]
+    model_name: Optional[str] = None
+
+class BatchPredictionItem(BaseModel):
+    predicted_price: float
+    missing_features: Optional[List[str]] = None
+
+class BatchPredictionResponse(BaseModel):
+    model_used: Optional[str] = None
+    confidence_metrics: Optional[Dict[str, Any]] = None
+    predictions: List[BatchPredictionItem]
+
+# Short names accepted by ?fields= on /predict and /predict/batch
+RESPONSE_FIELDS = {
+    'price': 'predicted_price',
+    'model': 'model_used',
+    'metrics': 'confidence_metrics',
+    'features': 'features_used',
+    'missing': 'missing_features',
+}
+
+def parse_fields(fields, allowed):
+    """Response keys selected by a comma-separated ``fields`` value (None = all of ``allowed``)"""
+    if fields is None:
+        return set(allowed)
+    selected = set()
+    for name in filter(None, (f.strip() for f in fields.split(','))):
+        key = RESPONSE_FIELDS.get(name, name)
+        if key not in allowed:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown field {name!r}; choose from {sorted(k for k, v in RESPONSE_FIELDS.items() if v in allowed)}"
+            )
+        selected.add(key)
+    return selected
 
 # --- Basic logging and in-memory metrics for monitoring ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("house-price-api")
 
+if MODEL_LOADING == 'eager':
+    load_artifacts()
+
 request_metrics: Dict[str, Any] = {
     'request_count': 0,
     'per_path': {},
@@ -109,16 +360,67 @@ request_metrics: Dict[str, Any] = {
     'last_prediction_ts': None,
 }
 
+# Histograms and error counters, also served in Prometheus text format. Under
+# src.serve every worker shares its counts through METRICS_MULTIPROC_DIR.
+metrics_registry = MetricsRegistry(multiprocess_dir=os.environ.get('METRICS_MULTIPROC_DIR') or None)
+REQUEST_SECONDS = metrics_registry.histogram(
+    'http_request_duration_seconds', 'Request latency by route and model', ('route', 'model')
+)
+REQUEST_ERRORS = metrics_registry.counter(
+    'http_request_errors_total', 'Responses with status >= 400 by route and status', ('route', 'status')
+)
+INFERENCE_SECONDS = metrics_registry.histogram(
+    'inference_duration_seconds', 'Model predict call latency', ('model',)
+)
+INFERENCE_BATCH_ROWS = metrics_registry.histogram(
+    'inference_batch_rows', 'Rows per model predict call', ('model',), buckets=BATCH_SIZE_BUCKETS
+)
+STAGE_SECONDS = metrics_registry.histogram(
+    'request_stage_duration_seconds', 'Time per request stage (see Server-Timing)', ('route', 'stage')
+)
+
+# Per-stage timings go out in a Server-Timing header (SERVER_TIMING=0 disables);
+# PROFILE_SAMPLE_RATE=N profiles 1 in N requests for download from /admin/profiles
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+profile_sampler = ProfileSampler(
+    sample_every=int(os.environ.get('PROFILE_SAMPLE_RATE', '0')),
+    keep=int(os.environ.get('PROFILE_KEEP', '20')),
+)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
-    start = time.time()
+    start = time.perf_counter()
     path = request.url.path
     request_metrics['request_count'] += 1
     request_metrics['per_path'][path] = request_metrics['per_path'].get(path, 0) + 1
-    response = await call_next(request)
-    duration_ms = int((time.time() - start) * 1000)
-    logger.info(f"%s %s -> %s in %dms", request.method, path, getattr(response, 'status_code', '200'), duration_ms)
-    return response
+    status, model = 500, ''
+    timer = StageTimer()
+    current_timer.set(timer)
+    sampled = path.startswith('/predict') and profile_sampler.maybe_start(timer)
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        model = response.headers.get('x-model-used', '')
+        if timer.stages:
+            # Whatever follows the handler's last mark is response serialization
+            timer.mark('serialize')
+            if SERVER_TIMING:
+                response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        # Label by route template, not raw path, to keep the label set bounded
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        REQUEST_SECONDS.observe(elapsed, route=route, model=model)
+        for stage, seconds in timer.stages.items():
+            STAGE_SECONDS.observe(seconds, route=route, stage=stage)
+        if status >= 400:
+            REQUEST_ERRORS.inc(route=route, status=status)
+        if sampled:
+            profile_sampler.finish(timer, request.method, path, status)
+        metrics_registry.flush()
+        logger.info("%s %s -> %s in %dms", request.method, path, status, int(elapsed * 1000))
 
 @app.get("/")
 async def root():
@@ -128,177 +430,483 @@ async def root():
         "endpoints": {
             "GET /models": "List all available models",
             "POST /predict": "Make a house price prediction",
+            "POST /predict/batch": "Make house price predictions for many houses at once",
+            "POST /predict/stream": "Score an NDJSON upload, streaming NDJSON predictions back",
             "GET /features": "Get required features and their default values",
             "GET /insights": "Get histogram and summary insights for dashboard",
-            "GET /health": "Health check",
-            "GET /metrics": "Basic API metrics"
+            "GET /health": "Liveness check",
+            "GET /ready": "Readiness check (models loaded)",
+            "GET /metrics": "Basic API metrics",
+            "GET /admin/profiles": "Sampled request profiles (PROFILE_SAMPLE_RATE)"
         }
     }
 
-@app.get("/models")
-async def list_models():
-    """List all available models and their performance metrics"""
+# /models, /features and /insights change only when models reload: their
+# bodies are built once per registry snapshot and revalidated by ETag
+METADATA_MAX_AGE = int(os.environ.get('METADATA_MAX_AGE', '60'))
+METADATA_CACHE_CONTROL = f"public, max-age={METADATA_MAX_AGE}" if METADATA_MAX_AGE > 0 else "no-cache"
+
+async def snapshot_payload(request, name, build):
+    """Serve ``build(snapshot)`` from the snapshot's payload cache"""
+    snapshot = await ready_snapshot()
+    payload = snapshot.payloads.get(name)
+    if payload is None:
+        payload = snapshot.payloads[name] = CachedPayload(build(snapshot), GZIP_MIN_SIZE)
+    return payload.response(request, METADATA_CACHE_CONTROL)
+
+def split_defaults():
+    """Numerical and categorical feature names among the reference defaults"""
+    numerical, categorical = [], []
+    for col, val in feature_defaults.items():
+        if isinstance(val, str):
+            categorical.append(col)
+        elif isinstance(val, (int, float)) and not isinstance(val, bool):
+            numerical.append(col)
+    return numerical, categorical
+
+def build_models_payload(snapshot):
     return {
         name: {
             "metrics": model['metadata']['metrics'],
-            "features": model['metadata']['features']
+            "features": model['metadata']['features'],
+            "version": model['version'],
+            "engine": type(model['engine']).__name__ if model.get('engine') is not None else 'native',
         }
-        for name, model in models.items()
+        for name, model in snapshot.models.items()
     }
 
-@app.get("/features")
-async def get_features():
-    """Get list of all features, their default values, and importance rankings"""
-    # Get feature importance from the best model
-    best_model_name = min(
-        models.items(),
-        key=lambda x: x[1]['metadata']['metrics']['test']['mae'] 
-            if 'test' in x[1]['metadata']['metrics'] 
-            else x[1]['metadata']['metrics']['mae']
-    )[0]
-    
-    feature_importance = {}
-    if best_model_name in models:
-        model_info = models[best_model_name]
-        if hasattr(model_info['model'], 'feature_importances_'):
-            importances = model_info['model'].feature_importances_
-            feature_names = model_info['metadata']['features']
-            
-            # Create importance dictionary
-            importance_dict = dict(zip(feature_names, importances))
-            
-            # Sort by importance and get top features
-            sorted_features = sorted(importance_dict.items(), key=lambda x: x[1], reverse=True)
-            
-            for i, (feature, importance) in enumerate(sorted_features):
-                feature_importance[feature] = {
-                    'importance': float(importance),
-                    'rank': i + 1,
-                    'is_top_10': i < 10
-                }
-    
+def build_features_payload(snapshot):
+    # Feature importance of the best model, ranked once when the model loaded
+    model_info = snapshot.models.get(snapshot.best_model, {})
+    ranking = model_info.get('importance_ranking', [])
+
+    feature_importance = {
+        feature: {
+            'importance': importance,
+            'rank': i + 1,
+            'is_top_10': i < 10
+        }
+        for i, (feature, importance) in enumerate(ranking)
+    }
+
+    encoder = model_info.get('encoder')
+    numerical, categorical = split_defaults()
+
     return {
         "feature_defaults": feature_defaults,
         "feature_importance": feature_importance,
-        "numerical_features": [col for col in feature_defaults.keys() 
-                             if isinstance(feature_defaults[col], (int, float)) 
-                             and not isinstance(feature_defaults[col], bool)],
-        "categorical_features": [col for col in feature_defaults.keys() 
-                               if isinstance(feature_defaults[col], str)],
-        "top_features": [f[0] for f in sorted(feature_importance.items(), 
-                                            key=lambda x: x[1]['importance'], 
-                                            reverse=True)[:10]] if feature_importance else []
+        "categorical_values": encoder.categories if encoder is not None else {},
+        "numerical_features": numerical,
+        "categorical_features": categorical,
+        "top_features": [feature for feature, _ in ranking[:10]]
     }
 
-@app.get("/insights")
-async def get_insights():
-    """Return precomputed insights for visualizations (histogram, counts)."""
-    feature_counts = {
-        'numerical': len([col for col, val in feature_defaults.items() if isinstance(val, (int, float)) and not isinstance(val, bool)]),
-        'categorical': len([col for col, val in feature_defaults.items() if isinstance(val, str)]),
-    }
-    best_model_name = None
+def build_insights_payload(snapshot):
+    numerical, categorical = split_defaults()
     best_r2 = None
-    try:
-        best_model_name = min(
-            models.items(),
-            key=lambda x: x[1]['metadata']['metrics']['test']['mae'] 
-                if 'test' in x[1]['metadata']['metrics'] 
-                else x[1]['metadata']['metrics']['mae']
-        )[0]
-        metrics = models[best_model_name]['metadata']['metrics']
+    if snapshot.best_model is not None:
+        metrics = snapshot.models[snapshot.best_model]['metadata']['metrics']
         best_r2 = (metrics.get('test') or {}).get('r2') or metrics.get('r2')
-    except Exception:
-        pass
     return {
-        'feature_counts': feature_counts,
+        'feature_counts': {'numerical': len(numerical), 'categorical': len(categorical)},
         'saleprice_histogram': saleprice_hist,
-        'best_model': best_model_name,
+        'best_model': snapshot.best_model,
         'best_model_r2': best_r2,
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
-    """Make a house price prediction with optional features"""
+@app.get("/models")
+async def list_models(request: Request):
+    """List all available models and their performance metrics"""
+    return await snapshot_payload(request, 'models', build_models_payload)
+
+@app.get("/features")
+async def get_features(request: Request):
+    """Get list of all features, their default values, and importance rankings"""
+    return await snapshot_payload(request, 'features', build_features_payload)
+
+@app.get("/insights")
+async def get_insights(request: Request):
+    """Return precomputed insights for visualizations (histogram, counts)."""
+    return await snapshot_payload(request, 'insights', build_insights_payload)
+
+@app.post("/predict", response_model=PredictionResponse, response_model_exclude_none=True)
+async def predict(request: PredictionRequest, debug: bool = False, fields: Optional[str] = None):
+    """Make a house price prediction with optional features.
+
+    ``fields`` selects the response keys, e.g. ``fields=price,model`` to skip
+    the large ``features_used``/``missing_features`` echoes; the default is
+    every field.
+    """
+    # Time until here: reading the body and pydantic validation
+    mark('parse')
+    selected = parse_fields(fields, PredictionResponse.model_fields.keys() - {'timings'})
+    # One snapshot per request so a concurrent reload cannot mix model versions
+    snapshot = await ready_snapshot()
+
     # If no model specified, use the one with best test MAE
     if request.model_name is None:
-        request.model_name = min(
-            models.items(),
-            key=lambda x: x[1]['metadata']['metrics']['test']['mae'] 
-                if 'test' in x[1]['metadata']['metrics'] 
-                else x[1]['metadata']['metrics']['mae']
-        )[0]
+        request.model_name = snapshot.best_model
     
-    if request.model_name not in models:
+    if request.model_name not in snapshot.models:
         raise HTTPException(
             status_code=404,
             detail=f"Model {request.model_name} not found"
         )
     
-    model_info = models[request.model_name]
-    required_features = model_info['metadata']['features']
-    provided_features = set(request.features.keys())
-    
-    # Identify missing features
-    missing_features = [f for f in required_features if f not in provided_features]
-    
-    # Create input data with defaults for missing values
-    input_data = {}
-    for feature in required_features:
-        if feature in request.features:
-            input_data[feature] = request.features[feature]
-        elif feature in feature_defaults:
-            input_data[feature] = feature_defaults[feature]
-        else:
-            # For categorical features encoded as dummies, default to 0
-            if feature.find('_') > 0:  # Likely a dummy variable
-                input_data[feature] = 0
-            else:
-                input_data[feature] = 0  # Default numerical to 0 if no median available
-    
-    # Create feature vector
-    X = pd.DataFrame([input_data])
-    
-    # Ensure we have all needed columns in the right order
-    for col in required_features:
-        if col not in X.columns:
-            X[col] = 0
-    X = X[required_features]  # Reorder columns to match model expectations
+    model_info = snapshot.models[request.model_name]
+    layout = model_info['layout']
+
+    # Copy the precompiled default vector and overwrite only the supplied fields
+    try:
+        X, missing_features = layout.vector(request.features, with_missing='missing_features' in selected)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    mark('features')
     
     # Make prediction
     try:
-        prediction = model_info['model'].predict(X)[0]
+        prediction = (await score_rows(model_info, X))[0]
         
         # update metrics
         request_metrics['prediction_count'] += 1
         request_metrics['last_prediction_ts'] = time.time()
 
-        return PredictionResponse(
-            predicted_price=float(prediction),
-            model_used=request.model_name,
-            confidence_metrics=model_info['metadata']['metrics'],
-            features_used=input_data,
-            missing_features=missing_features
+        # Built as a plain dict and rendered directly; only requested fields are computed
+        result = {'predicted_price': float(prediction)}
+        if 'model_used' in selected:
+            result['model_used'] = request.model_name
+        if 'confidence_metrics' in selected:
+            result['confidence_metrics'] = model_info['metadata']['metrics']
+        if 'features_used' in selected:
+            result['features_used'] = layout.features_used(request.features)
+        if 'missing_features' in selected:
+            result['missing_features'] = missing_features
+        mark('respond')
+        timer = current_timer.get()
+        if debug and timer is not None:
+            result['timings'] = timer.as_ms()
+        return FastJSONResponse(result, headers={'X-Model-Used': request.model_name})
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction error: {str(e)}"
+        )
+
+# /predict/batch also takes and returns Arrow IPC (see columnar.py); the body
+# is parsed by hand, so both request formats are declared for the docs here
+BATCH_REQUEST_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'application/json': {'schema': {'$ref': '#/components/schemas/BatchPredictionRequest'}},
+            ARROW_STREAM: {'schema': {'type': 'string', 'format': 'binary'}},
+            ARROW_FILE: {'schema': {'type': 'string', 'format': 'binary'}},
+        },
+    },
+}
+
+async def read_batch_body(request):
+    """Read a /predict/batch body, refusing with 413 once it outgrows MAX_BATCH_SIZE rows
+
+    ``Content-Length`` is checked before anything is read; chunked bodies are
+    cut off as soon as they pass the limit. Either way an oversized batch is
+    never buffered whole, parsed or validated.
+    """
+    limit = MAX_BATCH_SIZE * MAX_BATCH_ROW_BYTES
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Batch body exceeds {limit} bytes ({MAX_BATCH_SIZE} rows of {MAX_BATCH_ROW_BYTES} bytes)"
+    )
+    length = request.headers.get('content-length', '')
+    if length.isdigit() and int(length) > limit:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def parse_batch_json(body):
+    """Validate a JSON batch body, reporting errors the way FastAPI does for declared bodies"""
+    try:
+        return BatchPredictionRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, 'loc': ('body', *err['loc'])} for err in e.errors(include_url=False)]
+        )
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    response_model_exclude_none=True,
+    openapi_extra=BATCH_REQUEST_BODY,
+)
+async def predict_batch(
+    http_request: Request, fields: Optional[str] = None, model_name: Optional[str] = None
+):
+    """Predict prices for many houses with a single model call.
+
+    Rows are scored together as one (N, F) matrix and results are returned
+    in the same order as ``instances``. ``fields`` works as on /predict
+    (``price``, ``model``, ``metrics``, ``missing``).
+
+    With ``Content-Type: application/vnd.apache.arrow.stream`` (or ``.file``)
+    the body is an Arrow table with one column per feature, null meaning
+    omitted; columns are copied into the feature matrix whole. The model is
+    then chosen with the ``model_name`` query parameter, and predictions come
+    back as Arrow unless ``Accept`` asks for JSON.
+    """
+    selected = parse_fields(fields, {'predicted_price', 'model_used', 'confidence_metrics', 'missing_features'})
+    content_type = media_type(http_request.headers.get('content-type'))
+    is_arrow = content_type in ARROW_TYPES
+    body = await read_batch_body(http_request)
+    if is_arrow:
+        if not columnar.available():
+            raise HTTPException(status_code=415, detail="Arrow bodies are not supported on this server")
+        try:
+            columns, n_rows = columnar.read_arrow(body, content_type)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid Arrow body: {e}")
+    else:
+        request = parse_batch_json(body)
+        n_rows = len(request.instances)
+        model_name = request.model_name or model_name
+    if not n_rows:
+        raise HTTPException(status_code=422, detail="instances must not be empty")
+    if n_rows > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_rows} rows exceeds limit of {MAX_BATCH_SIZE}"
+        )
+
+    snapshot = await ready_snapshot()
+    model_name = model_name or snapshot.best_model
+    if model_name not in snapshot.models:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model {model_name} not found"
         )
+
+    model_info = snapshot.models[model_name]
+    layout = model_info['layout']
+
+    mark('parse')
+
+    # Every row starts from the model's default vector
+    try:
+        if is_arrow:
+            X, mask = layout.columns(columns, n_rows)
+        else:
+            X, missing = layout.matrix(request.instances, with_missing='missing_features' in selected)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    mark('features')
+
+    try:
+        predictions = await score_rows(model_info, X)
+
+        request_metrics['prediction_count'] += n_rows
+        request_metrics['last_prediction_ts'] = time.time()
+
+        headers = {'X-Model-Used': model_name}
+        if is_arrow and 'missing_features' in selected:
+            missing = layout.missing(mask)
+        if accepts_arrow(http_request.headers.get('accept'), is_arrow):
+            out_type = ARROW_FILE if content_type == ARROW_FILE else ARROW_STREAM
+            out = {'predicted_price': np.asarray(predictions, dtype=np.float64)}
+            if 'missing_features' in selected:
+                out['missing_features'] = missing
+            content = columnar.write_arrow(out, out_type)
+            mark('respond')
+            return Response(content, media_type=out_type, headers=headers)
+
+        result = {}
+        if 'model_used' in selected:
+            result['model_used'] = model_name
+        if 'confidence_metrics' in selected:
+            result['confidence_metrics'] = model_info['metadata']['metrics']
+        if 'missing_features' in selected:
+            result['predictions'] = [
+                {'predicted_price': float(price), 'missing_features': row_missing}
+                for price, row_missing in zip(predictions, missing)
+            ]
+        else:
+            result['predictions'] = [{'predicted_price': float(price)} for price in predictions]
+        mark('respond')
+        return FastJSONResponse(result, headers=headers)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Prediction error: {str(e)}"
         )
 
+async def score_stream_chunk(model_info, lines):
+    """NDJSON result lines for one chunk of ``(line_number, features or LineError)``.
+
+    Valid rows are scored with one model call; rows the layout rejects and
+    unparsable lines become error lines in their original position.
+    """
+    layout = model_info['layout']
+    results = {}
+    rows = []
+    for line_no, item in lines:
+        if isinstance(item, LineError):
+            results[line_no] = {'line': line_no, 'error': str(item)}
+        else:
+            rows.append((line_no, item))
+    try:
+        X, missing = layout.matrix([features for _, features in rows])
+    except ValueError:
+        # Find the offending rows one by one and score the rest
+        valid, vectors, missing = [], [], []
+        for line_no, features in rows:
+            try:
+                x, row_missing = layout.vector(features)
+            except ValueError as e:
+                results[line_no] = {'line': line_no, 'error': str(e)}
+                continue
+            valid.append((line_no, features))
+            vectors.append(x)
+            missing.append(row_missing)
+        rows = valid
+        X = np.vstack(vectors) if vectors else None
+    if rows:
+        # A stream waits for a free inference slot instead of failing the
+        # chunk; meanwhile no more of the request body is read
+        predictions, error = None, None
+        try:
+            predictions = await score_rows(model_info, X, wait=True)
+        except Exception as e:
+            error = f"Prediction error: {str(e)}"
+        for i, (line_no, _) in enumerate(rows):
+            if predictions is None:
+                results[line_no] = {'line': line_no, 'error': error}
+            else:
+                results[line_no] = {
+                    'line': line_no,
+                    'predicted_price': float(predictions[i]),
+                    'missing_features': missing[i],
+                }
+        request_metrics['prediction_count'] += len(rows)
+        request_metrics['last_prediction_ts'] = time.time()
+    return b''.join(dumps(results[line_no]) + b'\n' for line_no, _ in lines)
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, model_name: Optional[str] = None):
+    """Score an NDJSON body (one feature object per line) and stream NDJSON back.
+
+    Lines are read and scored STREAM_CHUNK_SIZE at a time and each chunk's
+    results are sent as soon as it is done, so memory stays flat however
+    large the upload. Output lines follow input order and carry the input
+    ``line`` number with either ``predicted_price`` and ``missing_features``
+    (as in /predict) or an ``error``.
+    """
+    snapshot = await ready_snapshot()
+    model_name = model_name or snapshot.best_model
+    if model_name not in snapshot.models:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model {model_name} not found"
+        )
+    model_info = snapshot.models[model_name]
+
+    async def results():
+        chunk = []
+        async for item in iter_ndjson(request.stream(), STREAM_MAX_LINE_BYTES):
+            chunk.append(item)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield await score_stream_chunk(model_info, chunk)
+                chunk = []
+        if chunk:
+            yield await score_stream_chunk(model_info, chunk)
+
+    return NDJSONStreamingResponse(
+        results(),
+        headers={"X-Model-Used": model_name, "X-Model-Version": model_info['version']},
+    )
+
 @app.get("/health")
 async def health():
-    """Simple health check endpoint."""
+    """Liveness check; never waits for model loading (see /ready)."""
     return {
         'status': 'ok',
-        'models_loaded': len(models),
+        'models_loaded': len(registry.models),
+        'model_generation': registry.snapshot.generation,
         'has_reference_data': bool(feature_defaults),
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once models are loaded, 503 while loading or if none loaded.
+
+    In lazy mode the first probe starts loading in the background.
+    """
+    loaded = artifacts_ready.is_set()
+    body = {
+        'ready': loaded and len(registry.models) > 0,
+        'loading_mode': MODEL_LOADING,
+        'models_loaded': len(registry.models),
+    }
+    if not loaded and MODEL_LOADING == 'lazy':
+        start_loading_artifacts()
+    return JSONResponse(status_code=200 if body['ready'] else 503, content=body)
+
+def require_admin(request: Request):
+    if ADMIN_TOKEN and request.headers.get('x-admin-token') != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/admin/profiles")
+async def list_profiles(request: Request):
+    """Sampled request profiles kept in memory (PROFILE_SAMPLE_RATE)."""
+    require_admin(request)
+    return {'sample_every': profile_sampler.sample_every, 'profiles': profile_sampler.list()}
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: int, request: Request, format: str = 'pstats'):
+    """Download one profile: pstats binary (snakeviz, pstats.Stats) or ?format=text."""
+    require_admin(request)
+    profile = profile_sampler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if format == 'text':
+        return PlainTextResponse(profile_text(profile['data']))
+    return Response(
+        content=profile['data'],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.prof"'},
+    )
+
 @app.get("/metrics")
-async def metrics():
-    """Return basic in-memory metrics for monitoring."""
-    return request_metrics
+async def metrics(request: Request, format: Optional[str] = None):
+    """Return in-memory metrics as JSON, or Prometheus text with ?format=prometheus."""
+    accept = request.headers.get('accept', '')
+    if format == 'prometheus' or (format is None and ('text/plain' in accept or 'openmetrics' in accept)):
+        return PlainTextResponse(
+            metrics_registry.render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
+    return {
+        **request_metrics,
+        # Latency percentiles are estimated from the histogram buckets
+        'histograms': metrics_registry.summary(),
+        'prediction_cache': prediction_cache.stats(),
+        'micro_batching': micro_batcher.stats(),
+        'inference_executor': {
+            **inference_executor.stats(),
+            'model_threads': INFERENCE_MODEL_THREADS,
+        },
+        # Per-call timings of engines that record them (e.g. 'inplace')
+        'engines': {
+            name: info['engine'].stats()
+            for name, info in registry.models.items()
+            if hasattr(info.get('engine'), 'stats')
+        },
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,267 @@
+"""
+Score large listing files offline with the API's models.
+
+Usage:
+  python -m src.bulk_score listings.csv predictions.csv --key PID
+  python -m src.bulk_score listings.parquet predictions.csv --model xgboost --workers 8 --resume
+
+The input (CSV, or Parquet when pyarrow is installed) is read in chunks of
+``--chunk-size`` rows, so memory stays bounded however large the file is.
+The parent process is the only reader: it hands each parsed chunk to a
+process pool, so the file is read once. Every worker loads the models through
+the same ``ModelRegistry`` and fills omitted or empty fields with the same
+defaults as the API (reference statistics overlaid with the fitted
+preprocessor, see ``serving_defaults``). Results are appended to the output
+CSV in input order as ``<key columns>,predicted_price``; without ``--key``
+the key is the input row number.
+
+A row that cannot be scored (an unknown category, a non-numeric cell) does
+not stop the job: its price is left empty and ``<output>.rejects.csv`` gets
+``<key columns>,error`` for it.
+
+After each chunk is written, ``<output>.progress.json`` records how many
+chunks and output bytes are complete. ``--resume`` truncates the outputs to
+that point (dropping a half-written chunk) and skips the completed chunks;
+without an output file yet it starts from the first row. Skipping a CSV's
+completed rows still reads and tokenizes them once (only Parquet can jump to
+a batch), so resuming late in a large CSV costs one pass over its start.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .model_registry import ModelRegistry
+    from .reference_stats import load_reference_stats, serving_defaults
+except ImportError:  # running as a script: python src/bulk_score.py
+    from model_registry import ModelRegistry
+    from reference_stats import load_reference_stats, serving_defaults
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Per-process model state, set by load_state() in the parent or a worker
+_state = {}
+
+
+def load_state(models_dir, stats_path, model_name=None, engine='native', preprocessor_path=None):
+    """Load defaults and models once per process and pick the model to score with"""
+    defaults = serving_defaults(load_reference_stats(stats_path), preprocessor_path)
+    registry = ModelRegistry(models_dir, defaults, model_threads=1, engine=engine)
+    snapshot = registry.load()
+    name = model_name or snapshot.best_model
+    if name not in snapshot.models:
+        raise ValueError(f"Model {name!r} not found in {models_dir}; available: {sorted(snapshot.models)}")
+    _state.update(model_name=name, entry=snapshot.models[name])
+    return name
+
+
+def _init_worker(models_dir, stats_path, model_name, engine, preprocessor_path):
+    # With the fork start method the parent's loaded models are inherited
+    if not _state:
+        load_state(models_dir, stats_path, model_name, engine, preprocessor_path)
+
+
+def score_chunk(df):
+    """Predicted prices for one chunk of raw rows and {row position: error} for rows that failed.
+
+    The chunk is laid out in one pass; only when that fails is it retried
+    row by row, so one bad cell costs its row rather than the job.
+    """
+    entry = _state['entry']
+    predict = (entry['engine'] or entry['model']).predict
+    try:
+        X, _ = entry['layout'].frame(df)
+    except (TypeError, ValueError):
+        pass
+    else:
+        return predict(X), {}
+
+    rows, positions, errors = [], [], {}
+    for i in range(len(df)):
+        try:
+            X, _ = entry['layout'].frame(df.iloc[i:i + 1])
+        except (TypeError, ValueError) as e:
+            errors[i] = str(e)
+            continue
+        rows.append(X)
+        positions.append(i)
+    predictions = np.full(len(df), np.nan)
+    if rows:
+        predictions[positions] = predict(np.vstack(rows))
+    return predictions, errors
+
+
+def read_chunks(path, chunk_size, skip_chunks=0):
+    """Yield DataFrames of ``chunk_size`` rows from a CSV or Parquet file"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet requires pyarrow (pip install pyarrow)")
+        for i, batch in enumerate(pq.ParquetFile(path).iter_batches(batch_size=chunk_size)):
+            if i >= skip_chunks:
+                yield batch.to_pandas()
+        return
+    # pandas still reads and tokenizes skipped rows (it only skips building
+    # them), so resuming costs one pass over the completed part of the file
+    skip = range(1, skip_chunks * chunk_size + 1) if skip_chunks else None
+    yield from pd.read_csv(path, chunksize=chunk_size, skiprows=skip)
+
+
+def _progress_path(output):
+    return output + '.progress.json'
+
+
+def rejects_path(output):
+    return output + '.rejects.csv'
+
+
+def read_progress(output):
+    try:
+        with open(_progress_path(output), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_progress(output, progress):
+    tmp = _progress_path(output) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(progress, f)
+    os.replace(tmp, _progress_path(output))
+
+
+def run(input_path, output, model_name=None, key=None, chunk_size=50_000, workers=None,
+        resume=False, models_dir=None, stats_path=None, engine='native', preprocessor_path=None,
+        log=print):
+    """Score ``input_path`` into ``output``; returns the final progress record"""
+    models_dir = models_dir or os.path.join(ROOT, 'models')
+    stats_path = stats_path or os.path.join(models_dir, 'reference_stats.json')
+    preprocessor_path = preprocessor_path or os.path.join(models_dir, 'preprocessor.json')
+    workers = workers or os.cpu_count() or 1
+    name = load_state(models_dir, stats_path, model_name, engine, preprocessor_path)
+
+    job = {'input': os.path.abspath(input_path), 'model': name, 'version': _state['entry']['version'],
+           'chunk_size': chunk_size, 'key': key}
+    progress = read_progress(output) if resume else None
+    if progress is not None and not os.path.exists(output):
+        log(f"{output} does not exist yet; starting from the first row")
+        progress = None
+    if progress is not None:
+        if progress['job'] != job:
+            raise SystemExit(f"{_progress_path(output)} belongs to a different job; rerun without --resume")
+        with open(output, 'r+b') as f:
+            f.truncate(progress['output_bytes'])
+        if os.path.exists(rejects_path(output)):
+            with open(rejects_path(output), 'r+b') as f:
+                f.truncate(progress.get('rejects_bytes', 0))
+        log(f"Resuming after chunk {progress['chunks']} ({progress['rows']} rows)")
+    else:
+        progress = {'job': job, 'chunks': 0, 'rows': 0, 'rejected': 0, 'output_bytes': 0, 'rejects_bytes': 0}
+        open(output, 'wb').close()
+        # The rejects file only exists when some row was rejected
+        if os.path.exists(rejects_path(output)):
+            os.remove(rejects_path(output))
+
+    pool = None
+    if workers > 1:
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_init_worker,
+            initargs=(models_dir, stats_path, name, engine, preprocessor_path),
+        )
+
+    start = time.perf_counter()
+    rows_this_run = 0
+    chunks = enumerate(read_chunks(input_path, chunk_size, progress['chunks']), start=progress['chunks'])
+    # At most 2 chunks per worker are read ahead, which bounds memory
+    inflight = []
+
+    def write(index, keys, scored):
+        nonlocal rows_this_run
+        predictions, errors = scored
+        out = keys.copy()
+        out['predicted_price'] = predictions
+        with open(output, 'a', encoding='utf-8', newline='') as f:
+            out.to_csv(f, header=progress['output_bytes'] == 0, index=False)
+            progress['output_bytes'] = f.tell()
+        if errors:
+            rejected = keys.iloc[list(errors)].copy()
+            rejected['error'] = list(errors.values())
+            with open(rejects_path(output), 'a', encoding='utf-8', newline='') as f:
+                rejected.to_csv(f, header=progress.get('rejects_bytes', 0) == 0, index=False)
+                progress['rejects_bytes'] = f.tell()
+            progress['rejected'] = progress.get('rejected', 0) + len(errors)
+            log(f"chunk {index}: {len(errors)} rows rejected, see {rejects_path(output)}")
+        progress['chunks'] = index + 1
+        progress['rows'] += len(out)
+        write_progress(output, progress)
+        rows_this_run += len(out)
+        elapsed = time.perf_counter() - start
+        log(f"chunk {index}: {progress['rows']} rows written, {rows_this_run / elapsed:,.0f} rows/sec")
+
+    try:
+        for index, df in chunks:
+            if key:
+                keys = df[[key]].reset_index(drop=True)
+            else:
+                # Every chunk but the last holds exactly chunk_size rows
+                keys = pd.DataFrame({'row': np.arange(len(df), dtype=np.int64) + index * chunk_size})
+            if pool is None:
+                write(index, keys, score_chunk(df))
+                continue
+            inflight.append((index, keys, pool.submit(score_chunk, df)))
+            while len(inflight) >= 2 * workers:
+                write(*_result(inflight.pop(0)))
+        while inflight:
+            write(*_result(inflight.pop(0)))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    rate = rows_this_run / elapsed if elapsed else 0.0
+    log(f"Scored {rows_this_run} rows with {name} in {elapsed:.1f}s ({rate:,.0f} rows/sec) -> {output}")
+    if progress.get('rejected'):
+        log(f"{progress['rejected']} rows could not be scored -> {rejects_path(output)}")
+    return progress
+
+
+def _result(item):
+    index, keys, future = item
+    return index, keys, future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or Parquet file of raw listings")
+    parser.add_argument("output", help="CSV file to write predictions to")
+    parser.add_argument("--model", help="Model name (default: best model by test MAE)")
+    parser.add_argument("--key", help="Input column to copy into the output as the row key")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", default="native", choices=["native", "numpy", "inplace"])
+    parser.add_argument("--models-dir")
+    parser.add_argument("--reference-stats", help="Defaults artifact (default: <models-dir>/reference_stats.json)")
+    parser.add_argument("--preprocessor", help="Fitted preprocessing whose fill values override the defaults "
+                                               "when present (default: <models-dir>/preprocessor.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last completed chunk")
+    args = parser.parse_args(argv)
+    run(args.input, args.output, model_name=args.model, key=args.key, chunk_size=args.chunk_size,
+        workers=args.workers, resume=args.resume, models_dir=args.models_dir,
+        stats_path=args.reference_stats, engine=args.engine, preprocessor_path=args.preprocessor)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
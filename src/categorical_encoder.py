@@ -0,0 +1,78 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+
+class CategoricalEncoder:
+    """Fitted mapping from raw categorical values to one-hot dummy columns.
+
+    Mirrors ``pd.get_dummies(X, columns=categorical_cols, drop_first=True)``
+    as used in the training notebook: each column's categories are sorted,
+    the first one is the dropped baseline (all dummies 0) and every other
+    value ``v`` of column ``c`` sets the dummy column ``f"{c}_{v}"``.
+    """
+
+    def __init__(self, categories, drop_first=True):
+        self.categories = {col: [str(v) for v in values] for col, values in categories.items()}
+        self.drop_first = drop_first
+        # Sorted arrays allow vectorized lookups with np.searchsorted
+        self._sorted = {col: np.array(values, dtype=object) for col, values in self.categories.items()}
+
+    @classmethod
+    def fit(cls, df, columns=None, drop_first=True):
+        """Learn the category list of each categorical column of ``df``"""
+        if columns is None:
+            columns = df.select_dtypes(include=['object']).columns
+        categories = {
+            col: sorted(str(v) for v in df[col].dropna().unique())
+            for col in columns
+        }
+        return cls(categories, drop_first=drop_first)
+
+    @property
+    def columns(self):
+        return list(self.categories)
+
+    def dummy_columns(self, column):
+        """Return the dummy column names for ``column``, one per category (None for the baseline)"""
+        values = self.categories[column]
+        names = [f"{column}_{v}" for v in values]
+        if self.drop_first and names:
+            names[0] = None
+        return names
+
+    def codes(self, column, values):
+        """Vectorized category codes for an array of raw values; -1 marks unknown values"""
+        cats = self._sorted[column]
+        values = np.array([str(v) for v in values], dtype=object)
+        if len(cats) == 0:
+            return np.full(len(values), -1, dtype=np.int64)
+        pos = np.searchsorted(cats, values)
+        clipped = np.minimum(pos, len(cats) - 1)
+        return np.where(cats[clipped] == values, clipped, -1).astype(np.int64)
+
+    def transform(self, df):
+        """One-hot encode ``df`` the way the training notebook does, without pandas re-sorting"""
+        out = df.drop(columns=[c for c in self.columns if c in df.columns])
+        dummies = {}
+        for col in self.columns:
+            if col not in df.columns:
+                continue
+            codes = self.codes(col, df[col].to_numpy())
+            for k, name in enumerate(self.dummy_columns(col)):
+                if name is not None:
+                    dummies[name] = codes == k
+        # One concat instead of a column insert per dummy
+        return pd.concat([out, pd.DataFrame(dummies, index=df.index)], axis=1)
+
+    def to_dict(self):
+        return {'categories': self.categories, 'drop_first': self.drop_first}
+
+    def save(self, path):
+        """Persist as a plain dict so the artifact does not depend on this class"""
+        joblib.dump(self.to_dict(), path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        return cls(state['categories'], drop_first=state.get('drop_first', True))
@@ -0,0 +1,75 @@
+"""
+Arrow IPC request/response bodies for columnar batch scoring.
+
+A batch sent as an Arrow record batch (one column per feature) is decoded
+straight into numpy column arrays and written into the model's feature
+layout with one assignment per column (``FeatureLayout.columns``), so no
+per-row dicts are built. Polars is used to read and write the IPC format
+and is imported on first use; without it Arrow bodies are rejected and JSON
+keeps working.
+"""
+import io
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+ARROW_FILE = 'application/vnd.apache.arrow.file'
+ARROW_TYPES = (ARROW_STREAM, ARROW_FILE)
+
+
+def media_type(header):
+    """The bare, lower-cased media type of a Content-Type header value"""
+    return (header or '').split(';', 1)[0].strip().lower()
+
+
+def accepts_arrow(accept, request_is_arrow):
+    """Whether the response should be Arrow for this ``Accept`` header.
+
+    An explicit Arrow type wins; an absent or wildcard ``Accept`` answers in
+    the request's format.
+    """
+    types = [media_type(part) for part in (accept or '').split(',') if part.strip()]
+    if any(t in ARROW_TYPES for t in types):
+        return True
+    return request_is_arrow and (not types or '*/*' in types)
+
+
+def _polars():
+    try:
+        import polars
+    except ImportError:
+        return None
+    return polars
+
+
+def available():
+    return _polars() is not None
+
+
+def read_arrow(body, content_type=ARROW_STREAM):
+    """Decode an Arrow IPC stream or file into ({column: ndarray}, n_rows).
+
+    Numeric and boolean columns come back as float64 with NaN for nulls (as
+    a JSON ``null`` is treated), string columns as object arrays with None
+    for nulls.
+    """
+    pl = _polars()
+    if pl is None:
+        raise RuntimeError("Arrow bodies need polars installed")
+    reader = pl.read_ipc if content_type == ARROW_FILE else pl.read_ipc_stream
+    df = reader(io.BytesIO(body))
+    # A nullable boolean column would otherwise come back as an object array of True/False/None
+    df = df.with_columns(pl.col(pl.Boolean).cast(pl.Float64))
+    return {name: df.get_column(name).to_numpy() for name in df.columns}, df.height
+
+
+def write_arrow(columns, content_type=ARROW_STREAM):
+    """Encode a mapping of column name -> sequence as an Arrow IPC stream or file"""
+    pl = _polars()
+    if pl is None:
+        raise RuntimeError("Arrow bodies need polars installed")
+    buffer = io.BytesIO()
+    df = pl.DataFrame(columns)
+    if content_type == ARROW_FILE:
+        df.write_ipc(buffer)
+    else:
+        df.write_ipc_stream(buffer)
+    return buffer.getvalue()
@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 
+try:
+    from .preprocessor import Preprocessor
+except ImportError:  # imported with src/ on sys.path
+    from preprocessor import Preprocessor
+
 def remove_outliers(df, column, n_std=2.5):
     """Remove outliers based on standard deviation"""
     mean = df[column].mean()
@@ -8,16 +13,35 @@ def remove_outliers(df, column, n_std=2.5):
     return df[(df[column] <= mean + (n_std * std)) & 
              (df[column] >= mean - (n_std * std))]
 
-def check_data_quality(df):
-    """Check data quality and print summary"""
+def _lazy_engine():
+    try:
+        from . import lazy_engine
+    except ImportError:  # imported with src/ on sys.path
+        import lazy_engine
+    return lazy_engine
+
+def check_data_quality(df, engine='pandas'):
+    """Check data quality and print summary.
+
+    With ``engine='polars'``, ``df`` may also be a CSV path or a LazyFrame; the
+    report is computed by Polars queries without loading the data into pandas.
+    """
     print("=== Data Quality Report ===")
+    if engine == 'polars':
+        report = _lazy_engine().quality_report(df)
+        dtypes, missing, duplicates = pd.Series(report['dtypes']), report['missing'], report['duplicates']
+        negatives = report['negatives']
+    else:
+        dtypes, missing, duplicates = df.dtypes, df.isnull().sum(), df.duplicated().sum()
+        # Assuming negative values are invalid
+        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        negatives = {col: df[df[col] < 0].shape[0] for col in numeric_cols}
     
     # Check data types
     print("\nData Types:")
-    print(df.dtypes.value_counts())
+    print(dtypes.value_counts())
     
     # Check for missing values
-    missing = df.isnull().sum()
     if missing.any():
         print("\nColumns with missing values:")
         print(missing[missing > 0])
@@ -25,46 +49,58 @@ def check_data_quality(df):
         print("\nNo missing values found!")
     
     # Check for duplicates
-    duplicates = df.duplicated().sum()
     print(f"\nNumber of duplicate rows: {duplicates}")
     
     # Check numerical columns for invalid values
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
     print("\nChecking numerical columns for invalid values...")
-    for col in numeric_cols:
-        invalid = df[df[col] < 0].shape[0]  # Assuming negative values are invalid
+    for col, invalid in negatives.items():
         if invalid > 0:
             print(f"- {col}: {invalid} negative values found")
             
     return {'missing': missing, 'duplicates': duplicates}
 
-def prepare_data(df):
-    """Prepare data by handling missing values and outliers"""
+def prepare_data(df, preprocessor=None, engine='pandas'):
+    """Prepare data by handling missing values and outliers.
+
+    Uses ``preprocessor`` (a fitted ``Preprocessor``) or fits one on ``df``:
+    SalePrice outliers are trimmed first, then missing values are filled with
+    the medians/modes of the remaining rows, exactly as clean_data.py does.
+
+    ``engine='polars'`` runs the same steps as Polars query plans over the CSV
+    parsed once into memory (see lazy_engine.py for the measured trade-off);
+    ``df`` may then also be a CSV path or a LazyFrame, and the result is the
+    same pandas DataFrame.
+    """
     try:
         print("Starting data preparation...")
-        
-        
-        # Remove outliers from the SalePrice column
-        print("\nRemoving outliers from SalePrice...")
-        original_size = len(df)
-        df = remove_outliers(df, 'SalePrice', n_std=2.5)
-        removed_count = original_size - len(df)
-        print(f"Removed {removed_count} outliers ({(removed_count/original_size)*100:.2f}% of data)")
-        
-        # Handle missing values
-        print("\nHandling missing values...")
-        # For numerical columns, fill with median
-        numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        for col in numerical_cols:
-            if df[col].isnull().sum() > 0:
-                df[col].fillna(df[col].median(), inplace=True)
-                
-        # For categorical columns, fill with mode
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        for col in categorical_cols:
-            if df[col].isnull().sum() > 0:
-                df[col].fillna(df[col].mode()[0], inplace=True)
-        
+        if engine == 'polars':
+            lazy_engine = _lazy_engine()
+            # Parsed once; the fit, the row count and the transform all run on it
+            df = lazy_engine.load(df)
+            if preprocessor is None:
+                preprocessor = lazy_engine.fit(df)
+            original_size = lazy_engine.count_rows(df)
+            print("\nRemoving outliers from SalePrice and handling missing values...")
+            df = lazy_engine.collect(lazy_engine.transform(df, preprocessor))
+            # The parsed source is released before the pandas copy is built
+            df = lazy_engine.to_pandas(df)
+            removed_count = original_size - len(df)
+            print(f"Removed {removed_count} outliers ({(removed_count/original_size)*100:.2f}% of data)")
+        else:
+            if preprocessor is None:
+                preprocessor = Preprocessor.fit(df)
+
+            # Remove outliers from the SalePrice column
+            print("\nRemoving outliers from SalePrice...")
+            original_size = len(df)
+            df = preprocessor.filter_outliers(df)
+            removed_count = original_size - len(df)
+            print(f"Removed {removed_count} outliers ({(removed_count/original_size)*100:.2f}% of data)")
+
+            # Handle missing values: one fillna with the fitted medians (numerical) and modes (categorical)
+            print("\nHandling missing values...")
+            df = preprocessor.transform(df)
+
         # Verify no missing values remain
         remaining_missing = df.isnull().sum().sum()
         print(f"Remaining missing values: {remaining_missing}")
@@ -1,9 +1,12 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+# matplotlib and sklearn are imported on first use so importing this module
+# stays cheap for code that never plots
 
 def evaluate_model(y_true, y_pred, model_name):
     """Calculate and display model performance metrics"""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
     mae = mean_absolute_error(y_true, y_pred)
     mse = mean_squared_error(y_true, y_pred)
     rmse = np.sqrt(mse)
@@ -18,6 +21,8 @@ def evaluate_model(y_true, y_pred, model_name):
 
 def plot_predictions(y_true, y_pred, model_name):
     """Create scatter plot of predicted vs actual values"""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.scatter(y_true, y_pred, alpha=0.5)
     plt.plot([y_true.min(), y_true.max()], [y_true.min(), y_true.max()], 'r--', lw=2)
@@ -0,0 +1,198 @@
+import numpy as np
+
+
+def _as_float(value):
+    """Coerce a default to float, treating non-numeric defaults as 0"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class FeatureLayout:
+    """Precompiled feature vector template for a single model.
+
+    Built once when a model loads: a float32 vector holding the default for
+    every feature in the model's column order, plus a name -> column index
+    map. Assembling a request is then a copy of the template followed by one
+    write per supplied field, so the Python work is O(fields supplied) rather
+    than O(total features).
+
+    With a fitted ``CategoricalEncoder`` the layout also accepts raw
+    categorical values (e.g. ``Neighborhood="NAmes"``): each category maps to
+    its dummy column through a lookup table built here, and string defaults
+    such as the Neighborhood mode are encoded into the template.
+    """
+
+    def __init__(self, features, defaults, encoder=None):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+        self.encoder = encoder
+        template = np.array(
+            [_as_float(defaults.get(f, 0)) for f in self.features], dtype=np.float32
+        )
+
+        # raw column -> (category code -> layout index or -1, dummy block indices, value -> layout index)
+        self.categorical = {}
+        if encoder is not None:
+            for col in encoder.columns:
+                names = encoder.dummy_columns(col)
+                code_index = np.array(
+                    [self.index.get(name, -1) if name else -1 for name in names], dtype=np.int64
+                )
+                block = code_index[code_index >= 0]
+                if len(block) == 0 or col in self.index:
+                    continue
+                lookup = dict(zip(encoder.categories[col], code_index.tolist()))
+                self.categorical[col] = (code_index, block, lookup)
+                default = defaults.get(col)
+                if isinstance(default, str) and lookup.get(default, -1) >= 0:
+                    template[lookup[default]] = 1.0
+
+        self.template = template
+        self.template.setflags(write=False)
+        self.defaults = {f: defaults.get(f, 0) for f in self.features}
+        for col, (_, block, _) in self.categorical.items():
+            for i in block:
+                self.defaults[self.features[i]] = int(template[i])
+
+    def __len__(self):
+        return len(self.features)
+
+    def _set_category(self, row, name, value):
+        """Write the dummy block of raw column ``name``; return the block indices"""
+        _, block, lookup = self.categorical[name]
+        target = lookup.get(str(value))
+        if target is None:
+            raise ValueError(f"Unknown category {value!r} for feature {name!r}")
+        row[block] = 0.0
+        if target >= 0:
+            row[target] = 1.0
+        return block
+
+    def _fill(self, row, values):
+        """Write the known fields of ``values`` into ``row``; return supplied indices"""
+        supplied = []
+        for name, value in values.items():
+            i = self.index.get(name)
+            if i is None:
+                if name in self.categorical:
+                    supplied.extend(self._set_category(row, name, value))
+                continue
+            try:
+                row[i] = value
+            except (TypeError, ValueError):
+                raise ValueError(f"Feature {name!r} must be numeric, got {value!r}")
+            supplied.append(i)
+        return supplied
+
+    def _missing(self, supplied_mask):
+        return [self.features[i] for i in np.flatnonzero(~supplied_mask)]
+
+    def vector(self, values, with_missing=True):
+        """Return a (1, F) float32 matrix for one request and its missing features.
+
+        Listing the missing features walks all F features, so with
+        ``with_missing=False`` it is skipped (None is returned) and the cost
+        stays O(fields supplied).
+        """
+        x = self.template.copy()
+        supplied = self._fill(x, values)
+        if not with_missing:
+            return x.reshape(1, -1), None
+        mask = np.zeros(len(self.features), dtype=bool)
+        mask[supplied] = True
+        return x.reshape(1, -1), self._missing(mask)
+
+    def matrix(self, rows, with_missing=True):
+        """Return an (N, F) float32 matrix for many requests and per-row missing features.
+
+        Numeric fields are written row by row; raw categorical values are
+        collected per column and encoded for the whole batch at once. With
+        ``with_missing=False`` the per-row lists are not built (None).
+        """
+        X = np.tile(self.template, (len(rows), 1))
+        mask = np.zeros(X.shape, dtype=bool)
+        pending = {}
+        for r, values in enumerate(rows):
+            for name, value in values.items():
+                i = self.index.get(name)
+                if i is None:
+                    if name in self.categorical:
+                        pending.setdefault(name, ([], []))
+                        pending[name][0].append(r)
+                        pending[name][1].append(value)
+                    continue
+                try:
+                    X[r, i] = value
+                except (TypeError, ValueError):
+                    raise ValueError(f"Feature {name!r} must be numeric, got {value!r}")
+                mask[r, i] = True
+
+        for name, (row_ids, raw) in pending.items():
+            self._encode_column(X, mask, name, np.asarray(row_ids), raw)
+
+        return X, self.missing(mask) if with_missing else None
+
+    def missing(self, mask):
+        """Per-row missing feature names for an (N, F) supplied-feature mask"""
+        return [self._missing(m) for m in mask]
+
+    def frame(self, df):
+        """Return an (N, F) float32 matrix and supplied-feature mask for a DataFrame.
+
+        Column-wise counterpart of ``matrix`` for bulk scoring: each known
+        column is written with one assignment, and empty cells (NaN) keep
+        the default exactly like an omitted field.
+        """
+        return self.columns({name: df[name].to_numpy() for name in df.columns}, len(df))
+
+    def columns(self, columns, n_rows):
+        """Like ``frame`` for a mapping of column name -> 1-D array of ``n_rows`` values.
+
+        Used for columnar request bodies (e.g. Arrow); missing values are
+        NaN in numeric columns and None/NaN in categorical ones.
+        """
+        X = np.tile(self.template, (n_rows, 1))
+        mask = np.zeros(X.shape, dtype=bool)
+        for name, values in columns.items():
+            i = self.index.get(name)
+            if i is not None:
+                try:
+                    values = np.asarray(values, dtype=np.float64)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Feature {name!r} must be numeric")
+                present = ~np.isnan(values)
+                X[present, i] = values[present]
+                mask[present, i] = True
+            elif name in self.categorical:
+                values = np.asarray(values, dtype=object)
+                present = np.array([v is not None and v == v for v in values], dtype=bool)
+                self._encode_column(X, mask, name, np.flatnonzero(present), values[present])
+        return X, mask
+
+    def _encode_column(self, X, mask, name, row_ids, raw):
+        """One-hot encode raw values of categorical column ``name`` into ``row_ids``"""
+        code_index, block, _ = self.categorical[name]
+        codes = self.encoder.codes(name, raw)
+        if (codes < 0).any():
+            bad = raw[int(np.flatnonzero(codes < 0)[0])]
+            raise ValueError(f"Unknown category {bad!r} for feature {name!r}")
+        X[np.ix_(row_ids, block)] = 0.0
+        mask[np.ix_(row_ids, block)] = True
+        targets = code_index[codes]
+        hit = targets >= 0
+        X[row_ids[hit], targets[hit]] = 1.0
+
+    def features_used(self, values):
+        """Echo the defaults overlaid with the supplied fields, as returned by /predict"""
+        used = dict(self.defaults)
+        for name, value in values.items():
+            if name in self.index:
+                used[name] = value
+            elif name in self.categorical:
+                _, block, lookup = self.categorical[name]
+                target = lookup.get(str(value), -1)
+                for i in block:
+                    used[self.features[i]] = int(i == target)
+        return used
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference queue is full; the API answers 503"""
+
+
+def default_model_threads(workers):
+    """Threads each model call may use so that workers x threads ~= cores"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def configure_model_threads(model, n_threads):
+    """Cap the threads a fitted model uses per predict call.
+
+    RandomForestRegressor parallelizes over trees with ``n_jobs``; XGBoost
+    uses ``n_jobs`` on the wrapper and ``nthread`` on the booster.
+    """
+    if n_threads is None:
+        return model
+    if hasattr(model, 'get_booster'):
+        try:
+            model.set_params(n_jobs=n_threads)
+            model.get_booster().set_param({'nthread': n_threads})
+        except Exception:
+            pass
+    elif hasattr(model, 'n_jobs'):
+        model.n_jobs = n_threads
+    return model
+
+
+def _set_done(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class InferenceExecutor:
+    """Bounded thread pool that keeps CPU-bound predict calls off the event loop.
+
+    scikit-learn trees and XGBoost release the GIL while predicting, so a
+    small thread pool gives real parallelism without copying models into
+    other processes. At most ``max_workers`` calls run at once and at most
+    ``max_queue`` more may wait; beyond that ``run`` raises
+    ``ExecutorSaturated`` immediately instead of queueing without bound.
+    Streaming callers pass ``wait=True`` to wait for a free slot instead,
+    which applies backpressure to whatever feeds them.
+    """
+
+    def __init__(self, max_workers=4, max_queue=64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._inflight = 0
+        # Futures of wait=True callers blocked on a full queue, oldest first
+        self._waiters = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.peak_inflight = 0
+
+    async def run(self, fn, *args, wait=False):
+        while True:
+            with self._lock:
+                if self._inflight < self.max_workers + self.max_queue:
+                    self._inflight += 1
+                    self.peak_inflight = max(self.peak_inflight, self._inflight)
+                    break
+                if not wait:
+                    self.rejected += 1
+                    raise ExecutorSaturated(
+                        f"Inference queue full ({self._inflight} calls in flight)"
+                    )
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        raise
+                # Woken just as we were cancelled: hand the free slot on
+                self._wake_next()
+                raise
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+                self.completed += 1
+            self._wake_next()
+
+    def _wake_next(self):
+        """Let the oldest waiting caller retry for the slot that just freed"""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.get_loop().call_soon_threadsafe(_set_done, waiter)
+                    return
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'inflight': self._inflight,
+            'waiting': len(self._waiters),
+            'peak_inflight': self.peak_inflight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
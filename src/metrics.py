@@ -0,0 +1,221 @@
+"""
+Fixed-bucket histograms and counters with Prometheus text exposition.
+
+Each metric keeps one row of counters per label combination, guarded by a
+lock, so ``observe``/``inc`` cost a dict lookup, a bisect and a few integer
+additions. Quantiles (p50/p95/p99) are estimated from the buckets at read
+time, the same way Prometheus' ``histogram_quantile`` does.
+
+Multiple worker processes: when ``MetricsRegistry.multiprocess_dir`` is set
+each process writes its counters to ``<dir>/<pid>.json`` (at most once per
+``flush_interval`` seconds, and whenever it renders), and rendering sums the
+files of every worker, so any worker answers /metrics for the whole server.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+# Seconds; covers sub-millisecond cache hits up to slow batch requests
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Rows per model call
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 10000)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dump(self):
+        with self._lock:
+            return {json.dumps(k): v for k, v in self._values.items()}
+
+    @staticmethod
+    def merge(dumps):
+        total = {}
+        for dump in dumps:
+            for key, value in dump.items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, json.loads(key))} {_format_value(value)}")
+        return lines
+
+    def summary(self, values):
+        return {'/'.join(json.loads(key)) or 'total': value for key, value in sorted(values.items())}
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    def dump(self):
+        with self._lock:
+            return {json.dumps(k): list(v) for k, v in self._values.items()}
+
+    @staticmethod
+    def merge(dumps):
+        total = {}
+        for dump in dumps:
+            for key, row in dump.items():
+                if key in total:
+                    total[key] = [a + b for a, b in zip(total[key], row)]
+                else:
+                    total[key] = list(row)
+        return total
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(values.items()):
+            label_values = json.loads(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), row[:-1]):
+                cumulative += count
+                le = _labels(self.labelnames, label_values, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.labelnames, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(float(row[-1]))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def quantile(self, row, q):
+        """Estimate quantile ``q`` by linear interpolation inside its bucket"""
+        counts = row[:-1]
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return float(self.buckets[-1])  # beyond the last finite bucket
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return float(self.buckets[-1])
+
+    def summary(self, values):
+        out = {}
+        for key, row in sorted(values.items()):
+            count = sum(row[:-1])
+            out['/'.join(json.loads(key)) or 'total'] = {
+                'count': count,
+                'sum': row[-1],
+                'mean': row[-1] / count if count else None,
+                'p50': self.quantile(row, 0.5),
+                'p95': self.quantile(row, 0.95),
+                'p99': self.quantile(row, 0.99),
+            }
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self, multiprocess_dir=None, flush_interval=1.0):
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self._last_flush = 0.0
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _path(self, pid):
+        return os.path.join(self.multiprocess_dir, f"{pid}.json")
+
+    def flush(self, force=False):
+        """Write this process' counters for the other workers to read"""
+        if not self.multiprocess_dir:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        path = self._path(os.getpid())
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({name: m.dump() for name, m in self.metrics.items()}, f)
+        os.replace(tmp, path)
+
+    def collect(self):
+        """Values of every metric, summed across worker processes"""
+        if not self.multiprocess_dir:
+            return {name: m.dump() for name, m in self.metrics.items()}
+        self.flush(force=True)
+        dumps = []
+        for file in os.listdir(self.multiprocess_dir):
+            if not file.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, file), encoding='utf-8') as f:
+                    dumps.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # a worker is replacing its file
+        return {
+            name: m.merge(d.get(name, {}) for d in dumps)
+            for name, m in self.metrics.items()
+        }
+
+    def render_prometheus(self):
+        values = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(values[name]))
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        values = self.collect()
+        return {name: metric.summary(values[name]) for name, metric in self.metrics.items()}
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+async def run_inline(fn, X):
+    """Default runner: call the model on the event loop thread"""
+    return fn(X)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one matrix predict call.
+
+    Rows are queued per model. A queue is flushed when it reaches
+    ``max_batch_size`` rows or when its first row has waited ``max_wait``
+    seconds, and every caller's future is resolved from the one result.
+
+    The wait is adaptive: while recent batches held a single row (low
+    concurrency) the queue is flushed on the next event-loop iteration
+    instead of after ``max_wait``, so a lone request never pays the wait,
+    but requests that arrive in the same iteration are still merged.
+    """
+
+    def __init__(self, max_batch_size=32, max_wait=0.002, runner=run_inline):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.runner = runner
+        self._pending = {}
+        self._timers = {}
+        # Exponential moving average of flushed batch sizes
+        self._avg_batch = 1.0
+        self.batches = 0
+        self.rows = 0
+        self.max_observed = 0
+        self.batch_size_counts = {}
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self):
+        return self.max_batch_size > 1
+
+    async def submit(self, key, predict_fn, row):
+        """Queue one feature row for the model identified by ``key``; return its prediction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(key, [])
+        queue.append((row, future, time.perf_counter()))
+        if len(queue) >= self.max_batch_size:
+            self._flush(key, predict_fn)
+        elif len(queue) == 1:
+            if self._avg_batch < 1.5:
+                self._timers[key] = loop.call_soon(self._flush, key, predict_fn)
+            else:
+                self._timers[key] = loop.call_later(self.max_wait, self._flush, key, predict_fn)
+        return await future
+
+    def _flush(self, key, predict_fn):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        now = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.rows += size
+        self.max_observed = max(self.max_observed, size)
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+        self.total_wait += sum(now - queued for _, _, queued in batch)
+        self._avg_batch = 0.8 * self._avg_batch + 0.2 * size
+        asyncio.get_running_loop().create_task(self._run(batch, predict_fn))
+
+    async def _run(self, batch, predict_fn):
+        X = np.vstack([row for row, _, _ in batch])
+        try:
+            predictions = await self.runner(predict_fn, X)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), value in zip(batch, predictions):
+            if not future.done():
+                future.set_result(float(value))
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'rows': self.rows,
+            'avg_batch_size': self.rows / self.batches if self.batches else None,
+            'max_batch_size_observed': self.max_observed,
+            'avg_queue_wait_ms': self.total_wait / self.rows * 1000 if self.rows else None,
+            'batch_size_counts': {str(k): v for k, v in sorted(self.batch_size_counts.items())},
+        }
@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import os
+import threading
+
+import joblib
+
+try:
+    from .categorical_encoder import CategoricalEncoder
+    from .feature_layout import FeatureLayout
+    from .inference_executor import configure_model_threads
+    from .tree_engine import flatten_model
+    from .xgboost_backend import XGBoostInplaceBackend
+except ImportError:  # running as a script: python src/api.py
+    from categorical_encoder import CategoricalEncoder
+    from feature_layout import FeatureLayout
+    from inference_executor import configure_model_threads
+    from tree_engine import flatten_model
+    from xgboost_backend import XGBoostInplaceBackend
+
+logger = logging.getLogger("house-price-api")
+
+
+def model_test_mae(metadata):
+    """Test MAE from nested (train/test) or flat metrics"""
+    metrics = metadata['metrics']
+    return metrics['test']['mae'] if 'test' in metrics else metrics['mae']
+
+
+def artifact_paths(models_dir, model_name):
+    """Return the model, metadata and encoder paths for ``model_name``"""
+    return (
+        os.path.join(models_dir, f"{model_name}.joblib"),
+        os.path.join(models_dir, f"{model_name}_metadata.joblib"),
+        os.path.join(models_dir, f"{model_name}_encoder.joblib"),
+    )
+
+
+def discover_models(models_dir):
+    """Names of all models in ``models_dir`` (model files, not metadata/encoders)"""
+    return sorted(
+        file.replace('.joblib', '')
+        for file in os.listdir(models_dir)
+        if file.endswith('.joblib') and not file.endswith(('_metadata.joblib', '_encoder.joblib'))
+    )
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def build_engine(model_name, model, engine, features=None):
+    """Alternative predictor for ``model`` (None means call ``model.predict``)"""
+    if engine == 'native':
+        return None
+    if engine == 'inplace':
+        if not hasattr(model, 'get_booster'):
+            logger.warning("%s: inplace engine needs an XGBoost model; using native predict", model_name)
+            return None
+        # Feature names are checked here, once, instead of on every call
+        return XGBoostInplaceBackend(model, features if features is not None else model.get_booster().feature_names)
+    if engine == 'numpy':
+        try:
+            return flatten_model(model)
+        except (TypeError, ValueError) as e:
+            logger.warning("%s: numpy engine unavailable (%s); using native predict", model_name, e)
+            return None
+    raise ValueError(f"Unknown inference engine {engine!r} for {model_name}")
+
+
+def load_model_entry(models_dir, model_name, feature_defaults, mmap_mode=None, model_threads=None,
+                     engine='native'):
+    """Load one model with its metadata and precompute everything requests need.
+
+    With ``mmap_mode='r'`` the numpy arrays stored in an uncompressed joblib
+    file (e.g. the node arrays of sklearn trees) are memory-mapped instead of
+    read into memory, so loading cost no longer scales with model size.
+    ``model_threads`` caps the threads each predict call may use and
+    ``engine`` selects how rows are scored ('native', 'numpy' or 'inplace').
+    """
+    model_path, metadata_path, encoder_path = artifact_paths(models_dir, model_name)
+    # Taken before reading: a write during the load then changes the files
+    # after this signature, and the next reload_if_changed picks it up
+    signature = tuple(_file_signature(p) for p in (model_path, metadata_path, encoder_path))
+    metadata = joblib.load(metadata_path)
+    model = configure_model_threads(joblib.load(model_path, mmap_mode=mmap_mode), model_threads)
+    # Optional: lets clients send raw categories instead of dummy columns
+    try:
+        encoder = CategoricalEncoder.load(encoder_path)
+    except FileNotFoundError:
+        encoder = None
+
+    features = metadata['features']
+    n_features = getattr(model, 'n_features_in_', None)
+    if n_features is not None and n_features != len(features):
+        raise ValueError(
+            f"{model_name}: model expects {n_features} features but metadata lists {len(features)}"
+        )
+
+    importance_ranking = []
+    if hasattr(model, 'feature_importances_'):
+        importance_ranking = sorted(
+            zip(features, (float(v) for v in model.feature_importances_)),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+
+    return {
+        'name': model_name,
+        'model': model,
+        'metadata': metadata,
+        'encoder': encoder,
+        'layout': FeatureLayout(features, feature_defaults, encoder),
+        'engine': build_engine(model_name, model, engine, features),
+        'importance_ranking': importance_ranking,
+        'signature': signature,
+        'version': hashlib.sha1(f"{model_name}:{signature}".encode()).hexdigest()[:12],
+    }
+
+
+class RegistrySnapshot:
+    """Immutable view of the loaded models; requests read one snapshot start to finish"""
+
+    def __init__(self, models, generation):
+        self.models = models
+        self.generation = generation
+        # Serialized endpoint payloads derived from these models, filled on first use
+        self.payloads = {}
+        self.best_model = None
+        if models:
+            self.best_model = min(models.items(), key=lambda x: model_test_mae(x[1]['metadata']))[0]
+
+
+class ModelRegistry:
+    """Loads models from ``models_dir`` and hot-swaps them when the files change.
+
+    Everything derived from a model (best-model choice, sorted importances,
+    feature layout) is computed once per model version. A reload builds a
+    complete new snapshot off to the side and publishes it with a single
+    reference assignment, so in-flight requests keep the snapshot they
+    started with and nothing is dropped.
+    """
+
+    def __init__(self, models_dir, feature_defaults, mmap_mode=None, model_threads=None,
+                 engine='native', engine_overrides=None):
+        self.models_dir = models_dir
+        self.feature_defaults = feature_defaults
+        self.mmap_mode = mmap_mode
+        self.model_threads = model_threads
+        self.engine = engine
+        self.engine_overrides = engine_overrides or {}
+        self.snapshot = RegistrySnapshot({}, 0)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._failed = None
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def models(self):
+        return self.snapshot.models
+
+    @property
+    def best_model(self):
+        return self.snapshot.best_model
+
+    def _signatures(self):
+        return {
+            name: tuple(_file_signature(p) for p in artifact_paths(self.models_dir, name))
+            for name in discover_models(self.models_dir)
+        }
+
+    def load(self):
+        """(Re)load every model and publish a new snapshot; unchanged models are reused"""
+        with self._lock:
+            current = self.snapshot
+            models = {}
+            for name in discover_models(self.models_dir):
+                entry = current.models.get(name)
+                paths = artifact_paths(self.models_dir, name)
+                if entry is not None and entry['signature'] == tuple(_file_signature(p) for p in paths):
+                    models[name] = entry
+                else:
+                    models[name] = load_model_entry(
+                        self.models_dir, name, self.feature_defaults, self.mmap_mode, self.model_threads,
+                        self.engine_overrides.get(name, self.engine),
+                    )
+            self.snapshot = RegistrySnapshot(models, current.generation + 1)
+            return self.snapshot
+
+    def reload_if_changed(self):
+        """Reload when the files on disk changed and have been stable for one poll.
+
+        Waiting for two identical observations avoids picking up a model whose
+        ``.joblib`` pair is still being written. A failed load keeps serving
+        the previous snapshot.
+        """
+        if self.snapshot.generation == 0:
+            return False  # initial load has not happened yet
+        observed = self._signatures()
+        loaded = {name: entry['signature'] for name, entry in self.models.items()}
+        if observed == loaded or observed == self._failed:
+            self._pending = None
+            return False
+        if observed != self._pending:
+            self._pending = observed
+            return False
+        self._pending = None
+        try:
+            snapshot = self.load()
+        except Exception as e:
+            # Don't retry the same broken files on every poll
+            self._failed = observed
+            logger.error("Model reload failed, keeping previous models: %s", e)
+            return False
+        logger.info("Reloaded models (generation %d): %s", snapshot.generation, sorted(snapshot.models))
+        return True
+
+    def start_watching(self, interval):
+        """Poll ``models_dir`` every ``interval`` seconds in a daemon thread"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.error("Model watcher error: %s", e)
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
@@ -1,10 +1,13 @@
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score
-import xgboost as xgb
 import pandas as pd
 
+# sklearn and xgboost are imported inside the functions: together they take
+# most of a second to import and serving code never needs them from here
+
 def get_default_models():
     """Return dictionary of default model configurations"""
+    from sklearn.ensemble import RandomForestRegressor
+    import xgboost as xgb
+
     return {
         'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
         'XGBoost': xgb.XGBRegressor(objective='reg:squarederror', random_state=42)
@@ -12,6 +15,8 @@ def get_default_models():
 
 def debug_model_performance(model, X_train, X_test, y_train, y_test, model_name):
     """Debug model performance and print detailed analysis"""
+    from sklearn.metrics import mean_absolute_error, r2_score
+
     print(f"=== {model_name} Debug Report ===")
     
     # Training performance
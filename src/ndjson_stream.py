@@ -0,0 +1,79 @@
+import json
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+
+class LineError(Exception):
+    """A request line that could not be parsed into a feature object"""
+
+
+async def iter_ndjson(chunks, max_line_bytes=1 << 20):
+    """Yield ``(line_number, object or LineError)`` for each non-blank NDJSON line.
+
+    ``chunks`` is an async iterable of bytes split at arbitrary points (e.g.
+    ``Request.stream()``). Only the current partial line is buffered; a line
+    longer than ``max_line_bytes`` is reported and skipped without being
+    held in memory. Line numbers are 1-based and count blank lines.
+    """
+    buffer = bytearray()
+    line_no = 1
+    oversized = False
+
+    def parse(raw):
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            return LineError(f"Invalid JSON: {e}")
+        if not isinstance(value, dict):
+            return LineError("Each line must be a JSON object of features")
+        return value
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        oversized = True
+                        buffer.clear()
+                break
+            if oversized:
+                yield line_no, LineError(f"Line exceeds {max_line_bytes} bytes")
+                oversized = False
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_no, LineError(f"Line exceeds {max_line_bytes} bytes")
+                elif buffer.strip():
+                    yield line_no, parse(bytes(buffer))
+            buffer.clear()
+            line_no += 1
+            start = end + 1
+    if oversized:
+        yield line_no, LineError(f"Line exceeds {max_line_bytes} bytes")
+    elif buffer.strip():
+        yield line_no, parse(bytes(buffer))
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streams NDJSON while the body iterator is still reading the request.
+
+    ``StreamingResponse`` normally listens for a disconnect by calling
+    ``receive`` in a concurrent task, which would swallow request body
+    chunks the iterator is waiting for. Here only the iterator reads the
+    request; a client disconnect surfaces through ``Request.stream()`` or as
+    a failed send.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,62 @@
+"""
+Precomputed JSON bodies for read-mostly endpoints.
+
+/features, /models and /insights only change when a model is reloaded, yet
+dashboards poll them more often than /predict. Each payload is built once
+per registry snapshot and serialized to bytes (and gzip, when large
+enough). The body hash is used as a strong ETag. Serving a request is then
+a header comparison: a matching ``If-None-Match`` gets an empty 304, and
+anything else gets the stored bytes.
+"""
+import gzip
+import hashlib
+
+from starlette.responses import Response
+
+try:
+    from .responses import dumps
+except ImportError:  # running as a script: python src/api.py
+    from responses import dumps
+
+
+def _etag_values(header):
+    """Entity tags listed in an If-None-Match header, weak prefixes dropped"""
+    tags = set()
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class CachedPayload:
+    """Serialized response body with a strong ETag and an optional gzip variant"""
+
+    __slots__ = ('body', 'etag', 'gzipped', 'gzip_etag')
+
+    def __init__(self, content, gzip_min_size=1024):
+        self.body = dumps(content)
+        digest = hashlib.sha1(self.body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        # A different encoding is a different representation, so it gets its own strong tag
+        self.gzipped = None
+        self.gzip_etag = None
+        if gzip_min_size > 0 and len(self.body) >= gzip_min_size:
+            self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+            self.gzip_etag = f'"{digest}-gzip"'
+
+    def response(self, request, cache_control):
+        use_gzip = self.gzipped is not None and 'gzip' in request.headers.get('accept-encoding', '').lower()
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = {'ETag': etag, 'Cache-Control': cache_control}
+        if self.gzipped is not None:
+            headers['Vary'] = 'Accept-Encoding'
+        tags = _etag_values(request.headers.get('if-none-match'))
+        if '*' in tags or self.etag in tags or (self.gzip_etag and self.gzip_etag in tags):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return Response(self.gzipped, media_type='application/json', headers=headers)
+        return Response(self.body, media_type='application/json', headers=headers)
@@ -0,0 +1,111 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Per-entry cost beyond the key and value objects: the (value, expiry)
+# tuple, the expiry float and the OrderedDict slot and link node
+ENTRY_OVERHEAD_BYTES = sys.getsizeof((0.0, 0.0)) + sys.getsizeof(0.0) + 64
+
+
+class PredictionCache:
+    """In-process LRU cache with a TTL for model predictions.
+
+    Keys hash the model version together with the fully defaulted float32
+    feature vector, so a reloaded model never serves stale entries and two
+    requests that differ only in how defaults were spelled share an entry.
+    Size is bounded both in entries and in bytes. An entry's bytes are the
+    ``sys.getsizeof`` of its key and value plus ``ENTRY_OVERHEAD_BYTES``; the
+    value is measured shallowly, which is exact for the floats the API stores.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=16 * 1024 * 1024, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def key(model_version, row):
+        """Cache key for one feature row (a 1-D float32 array) of ``model_version``"""
+        h = hashlib.blake2b(model_version.encode(), digest_size=16)
+        h.update(row.tobytes())
+        return h.digest()
+
+    @staticmethod
+    def entry_bytes(key, value):
+        """Memory held by one cached entry"""
+        return sys.getsizeof(key) + sys.getsizeof(value) + ENTRY_OVERHEAD_BYTES
+
+    def get(self, key):
+        """Return the cached prediction or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires, size = item
+            if expires < self._clock():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        size = self.entry_bytes(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, self._clock() + self.ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+            nbytes = self._bytes
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': size,
+            'bytes': nbytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
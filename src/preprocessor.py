@@ -0,0 +1,135 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .categorical_encoder import CategoricalEncoder
+except ImportError:  # running as a script: python src/api.py
+    from categorical_encoder import CategoricalEncoder
+
+TARGET = 'SalePrice'
+# Identifier columns dropped before anything is learned
+ID_COLUMNS = ('PID', 'Order', 'Id')
+
+
+def _is_numeric(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class Preprocessor:
+    """Fitted cleaning step shared by training, scripts/clean_data.py and the API.
+
+    ``fit`` learns everything in one pass over the training frame:
+    - the SalePrice outlier bounds (mean +/- ``outlier_std`` standard deviations);
+    - the column schema (dtype of every column);
+    - the imputation values;
+    - the dummy layout (a ``CategoricalEncoder``).
+
+    Imputation values are the median of each numeric column and the mode of
+    each categorical column. They are taken from the rows that survive the
+    outlier trim, which is the order the training notebook uses. Medians and
+    modes are each one vectorized pandas call across all columns.
+
+    ``transform`` then fills any batch or chunk from these stored values
+    alone, so the result does not depend on how the data is split. The
+    fitted state is a small JSON document (``save``/``load``).
+    """
+
+    def __init__(self, fill_values, dtypes, numerical, categories, target_bounds=None, target=TARGET):
+        self.fill_values = dict(fill_values)
+        self.dtypes = dict(dtypes)
+        self.numerical = list(numerical)
+        self.categorical = list(categories)
+        self.target = target
+        self.target_bounds = tuple(target_bounds) if target_bounds is not None else None
+        self.encoder = CategoricalEncoder(categories)
+
+    @classmethod
+    def fit(cls, df, outlier_std=2.5, target=TARGET):
+        """Learn bounds, schema, fill values and categories from ``df``.
+
+        ``outlier_std=None`` skips the outlier trim.
+        """
+        df = df.drop(columns=[c for c in ID_COLUMNS if c in df.columns])
+        bounds = None
+        if outlier_std is not None and target in df.columns:
+            mean, std = df[target].mean(), df[target].std()
+            bounds = (float(mean - outlier_std * std), float(mean + outlier_std * std))
+            df = df[df[target].between(*bounds)]
+
+        numerical = [c for c, d in df.dtypes.items() if c != target and _is_numeric(d)]
+        categorical = [c for c in df.columns if c != target and c not in numerical]
+
+        fill_values = {}
+        medians = df[numerical].median()
+        fill_values.update({c: float(v) for c, v in medians.items() if not np.isnan(v)})
+        if categorical:
+            modes = df[categorical].mode(dropna=True)
+            if len(modes):
+                fill_values.update({c: v for c, v in modes.iloc[0].items() if isinstance(v, str)})
+
+        categories = {c: sorted(str(v) for v in df[c].dropna().unique()) for c in categorical}
+        dtypes = {c: str(d) for c, d in df.dtypes.items()}
+        return cls(fill_values, dtypes, numerical, categories, bounds, target)
+
+    def filter_outliers(self, df):
+        """Rows of ``df`` whose target lies within the fitted bounds (unchanged without bounds or target)"""
+        if self.target_bounds is None or self.target not in df.columns:
+            return df
+        return df[df[self.target].between(*self.target_bounds)]
+
+    def transform(self, df, encode=False):
+        """Drop id columns and fill missing values with the fitted values.
+
+        Integer columns that only became float because of missing values are
+        cast back to their fitted dtype. With ``encode=True`` categorical
+        columns are replaced by their dummy columns as in training.
+        """
+        df = df.drop(columns=[c for c in ID_COLUMNS if c in df.columns])
+        fills = {c: v for c, v in self.fill_values.items() if c in df.columns}
+        df = df.fillna(fills)
+        restore = {}
+        for c in self.numerical:
+            if c in df.columns and self.dtypes[c] == 'int64' and df[c].dtype != np.int64:
+                values = df[c].to_numpy()
+                if not np.isnan(values).any() and (values == np.round(values)).all():
+                    restore[c] = np.int64
+        if restore:
+            df = df.astype(restore)
+        if encode:
+            df = self.encoder.transform(df)
+        return df
+
+    @property
+    def defaults(self):
+        """Per-feature defaults as served by the API: the fill values (the target is never filled)"""
+        return dict(self.fill_values)
+
+    def to_dict(self):
+        return {
+            'fill_values': self.fill_values,
+            'dtypes': self.dtypes,
+            'numerical': self.numerical,
+            'categories': self.encoder.categories,
+            'target': self.target,
+            'target_bounds': list(self.target_bounds) if self.target_bounds is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['fill_values'], state['dtypes'], state['numerical'], state['categories'],
+                   state.get('target_bounds'), state.get('target', TARGET))
+
+    def save(self, path):
+        """Write the fitted state as compact JSON (atomically)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,169 @@
+"""
+Per-stage request timing and sampled cProfile capture.
+
+``metrics_middleware`` gives every request a ``StageTimer`` through a
+context variable; handlers call ``mark(stage)`` after each stage, which
+charges the time since the previous mark to that stage. ``mark`` is a no-op
+outside a request, so shared helpers such as ``score_rows`` can call it
+freely.
+
+Profiling: ``ProfileSampler.maybe_start`` samples 1 in ``sample_every``
+requests and profiles the whole request path. A handler profile runs on the
+event loop from the middleware until ``finish``, so parsing, default
+filling, encoding and serialization are all in it. The model calls run in
+the inference thread, under a second profile that ``profile_call`` enables
+around them. ``finish`` merges the two into one set of stats, saved with the
+request's stage timings. The handler profile also records whatever other
+requests the loop runs while the sampled one awaits; only one request is
+profiled at a time. Sampled requests bypass the micro-batcher, so the
+profiled model calls score that request's rows alone.
+
+On Python 3.12+ a profiler sees every thread (``sys.monitoring``), so the
+handler profile already covers the inference thread and the second profile
+can't be enabled: ``profile_call`` then runs the call as is. The same holds
+when another profiler (a debugger, coverage) is active. A profile that
+can't be enabled never fails the request.
+"""
+import contextvars
+import cProfile
+import io
+import itertools
+import marshal
+import pstats
+import threading
+import time
+from collections import deque
+
+current_timer = contextvars.ContextVar('stage_timer', default=None)
+
+
+class StageTimer:
+    __slots__ = ('start', 'last', 'stages', 'profile', 'handler_profile', 'profiled_calls')
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.stages = {}
+        self.profile = None
+        self.handler_profile = None
+        self.profiled_calls = 0
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last)
+        self.last = now
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def as_ms(self):
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()}
+
+    def server_timing(self):
+        """Value for the ``Server-Timing`` response header (durations in ms)"""
+        parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.total() * 1000:.3f}")
+        return ', '.join(parts)
+
+
+def mark(stage):
+    timer = current_timer.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+def profiling(timer):
+    """Whether ``timer``'s request was sampled for profiling"""
+    return timer is not None and timer.profile is not None
+
+
+def profile_call(timer, fn, *args):
+    """Run ``fn`` under the request's profiler when ``timer``'s request is sampled"""
+    if not profiling(timer):
+        return fn(*args)
+    try:
+        timer.profile.enable()
+    except ValueError:
+        # Another profiling tool is active; never fail the request over it
+        return fn(*args)
+    try:
+        return fn(*args)
+    finally:
+        timer.profile.disable()
+        timer.profiled_calls += 1
+
+
+class ProfileSampler:
+    """Profiles 1 in ``sample_every`` requests and keeps the last ``keep`` profiles"""
+
+    def __init__(self, sample_every=0, keep=20):
+        self.sample_every = sample_every
+        self._counter = itertools.count(1)
+        self._active = threading.Lock()
+        self._ids = itertools.count(1)
+        self.profiles = deque(maxlen=keep)
+
+    @property
+    def enabled(self):
+        return self.sample_every > 0
+
+    def maybe_start(self, timer):
+        if not self.enabled or next(self._counter) % self.sample_every:
+            return False
+        if not self._active.acquire(blocking=False):
+            return False
+        # Enabled around this request's model calls in the inference thread, see profile_call
+        timer.profile = cProfile.Profile()
+        handler = cProfile.Profile()
+        try:
+            handler.enable()
+        except ValueError:
+            pass  # another profiling tool is active
+        else:
+            timer.handler_profile = handler
+        return True
+
+    def finish(self, timer, method, path, status):
+        try:
+            profiles = []
+            if timer.handler_profile is not None:
+                timer.handler_profile.disable()
+                profiles.append(timer.handler_profile)
+            # The thread profile is empty without a model call (cache hit, error)
+            if timer.profiled_calls:
+                profiles.append(timer.profile)
+            data = pstats.Stats(*profiles).stats if profiles else {}
+            self.profiles.append({
+                'id': next(self._ids),
+                'method': method,
+                'path': path,
+                'status': status,
+                'timestamp': time.time(),
+                'duration_ms': round(timer.total() * 1000, 3),
+                'stages_ms': timer.as_ms(),
+                # Same bytes pstats.Stats.dump_stats writes; load with pstats or snakeviz
+                'profiled_calls': timer.profiled_calls,
+                'handler_profiled': timer.handler_profile is not None,
+                'data': marshal.dumps(data),
+            })
+        finally:
+            timer.profile = timer.handler_profile = None
+            self._active.release()
+
+    def list(self):
+        return [{k: v for k, v in p.items() if k != 'data'} for p in self.profiles]
+
+    def get(self, profile_id):
+        for profile in self.profiles:
+            if profile['id'] == profile_id:
+                return profile
+        return None
+
+
+def profile_text(data, sort='cumulative', limit=60):
+    """Render saved profile bytes as the usual pstats report"""
+    stream = io.StringIO()
+    stats = pstats.Stats(stream=stream)
+    stats.stats = marshal.loads(data)
+    stats.get_top_level_stats()
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    from .preprocessor import Preprocessor
+except ImportError:  # running as a script: python src/api.py
+    from preprocessor import Preprocessor
+
+# Bump when the layout of the artifact changes; older files are then ignored
+SCHEMA_VERSION = 1
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+TARGET = 'SalePrice'
+
+
+def target_histogram(values, bins=20):
+    """SalePrice histogram as stored in the artifact (counts, bin edges and centers)"""
+    counts, bin_edges = np.histogram(values, bins=bins)
+    centers = (bin_edges[:-1] + bin_edges[1:]) / 2.0
+    return {
+        'counts': counts.astype(int).tolist(),
+        'bin_edges': bin_edges.astype(float).tolist(),
+        'centers': centers.astype(float).tolist(),
+    }
+
+
+def compute_reference_stats(df, bins=20, quantiles=QUANTILES, source=None, preprocessor=None):
+    """Summarize a raw dataset into the statistics the API needs.
+
+    Defaults are the fill values of ``preprocessor`` (fitted on ``df`` when
+    not given): the median of every numeric column and the mode of every
+    categorical column after the SalePrice outlier trim. The API therefore
+    fills omitted features with the same values training imputed.
+    """
+    df = df.drop(columns=[c for c in ('PID', 'Order') if c in df.columns])
+    if preprocessor is None:
+        preprocessor = Preprocessor.fit(df)
+    defaults = preprocessor.defaults
+    numerical_cols = [c for c in preprocessor.numerical if c in df.columns]
+
+    feature_quantiles = {}
+    if numerical_cols:
+        q = df[numerical_cols].quantile(list(quantiles))
+        feature_quantiles = {
+            col: {str(p): float(v) for p, v in q[col].items() if not np.isnan(v)}
+            for col in numerical_cols
+        }
+
+    histogram = None
+    if TARGET in df.columns:
+        histogram = target_histogram(df[TARGET].dropna(), bins)
+
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'n_rows': int(len(df)),
+        'defaults': defaults,
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'quantiles': feature_quantiles,
+        'saleprice_histogram': histogram,
+    }
+
+
+def save_reference_stats(stats, path):
+    """Write the artifact as compact JSON (atomically, so readers never see half a file)"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def load_reference_stats(path):
+    """Read an artifact written by ``save_reference_stats``; ValueError if the schema is unknown"""
+    with open(path, encoding='utf-8') as f:
+        stats = json.load(f)
+    if stats.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported reference stats schema {stats.get('schema_version')!r} in {path}"
+        )
+    return stats
+
+
+def serving_defaults(stats, preprocessor_path=None):
+    """Feature defaults used at prediction time by the API and bulk scoring.
+
+    The artifact's defaults, overlaid with the fill values of the fitted
+    preprocessor when it is saved at ``preprocessor_path``, so omitted
+    features are filled exactly as training imputed them.
+    """
+    defaults = dict(stats['defaults'])
+    if preprocessor_path and os.path.exists(preprocessor_path):
+        defaults.update(Preprocessor.load(preprocessor_path).defaults)
+    return defaults
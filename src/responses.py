@@ -0,0 +1,22 @@
+import json
+
+from starlette.responses import JSONResponse
+
+try:  # optional: several times faster than json for large payloads
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def dumps(content):
+    """Serialize ``content`` to compact JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available (falls back to json)"""
+
+    def render(self, content):
+        return dumps(content)
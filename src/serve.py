@@ -0,0 +1,145 @@
+"""
+Multi-worker API server that shares model memory between workers.
+
+The parent process imports ``src.api`` (loading reference data and every
+model once), freezes the garbage collector so those objects' pages are not
+dirtied by GC bookkeeping, binds the listening socket and then forks the
+workers. Each worker inherits the already-loaded models copy-on-write
+instead of running ``joblib.load`` itself, so adding workers costs only the
+memory they actually write to.
+
+Usage:
+  python -m src.serve --workers 4 --port 8000
+
+Fork is POSIX-only; on Windows this falls back to a single process.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+
+def read_memory_kb(pid):
+    """Rss, Pss and shared sizes (kB) of ``pid`` from /proc/<pid>/smaps_rollup, or None"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            text = f.read()
+    except OSError:
+        return None
+    fields = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+            fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+    }
+
+
+def report_memory(pids):
+    """Print per-worker memory and how much of it is shared with the parent"""
+    for pid in pids:
+        mem = read_memory_kb(pid)
+        if mem is None:
+            print(f"  worker {pid}: memory report unavailable on this platform")
+            continue
+        # Rss counts shared pages in full, Pss splits them between sharers;
+        # the difference is what this worker does not pay for itself
+        saved = mem['rss'] - mem['pss']
+        print(
+            f"  worker {pid}: RSS {mem['rss'] / 1024:.1f} MB, PSS {mem['pss'] / 1024:.1f} MB, "
+            f"shared {mem['shared'] / 1024:.1f} MB, saved ~{saved / 1024:.1f} MB"
+        )
+
+
+def run_worker(app, sock, log_level):
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the API from several forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--report-after", type=float, default=10.0,
+                        help="Seconds after start to print the memory report (0 disables)")
+    args = parser.parse_args(argv)
+
+    # Everything must be loaded before forking for the workers to share it
+    os.environ["MODEL_LOADING"] = "eager"
+    # Workers publish their metrics here so any of them can answer /metrics for all
+    metrics_dir = os.environ.setdefault("METRICS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="api-metrics-"))
+    for file in os.listdir(metrics_dir):
+        if file.endswith(".json"):
+            os.remove(os.path.join(metrics_dir, file))
+    from src.api import app, registry
+
+    if not hasattr(os, "fork") or args.workers <= 1:
+        import uvicorn
+
+        print("Serving from a single process")
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    parent = read_memory_kb(os.getpid())
+    print(f"Loaded {len(registry.models)} models in parent {os.getpid()}"
+          + (f" (RSS {parent['rss'] / 1024:.1f} MB)" if parent else ""))
+
+    children = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                run_worker(app, sock, args.log_level)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print(f"Started {len(children)} workers on http://{args.host}:{args.port}")
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if args.report_after > 0:
+        time.sleep(args.report_after)
+        print("Memory per worker:")
+        report_memory(children)
+
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
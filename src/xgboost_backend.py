@@ -0,0 +1,81 @@
+import threading
+import time
+
+import numpy as np
+
+
+class XGBoostInplaceBackend:
+    """Scores an XGBRegressor through ``Booster.inplace_predict``.
+
+    The sklearn wrapper re-validates its input and may build a DMatrix on
+    every call. Here the feature names are checked once, when the backend is
+    created, and each call hands the booster a C-contiguous float32 array:
+    the caller's array as-is when it already has that layout, otherwise a
+    copy into a per-thread buffer that is allocated once and reused.
+    Per-call timings are kept so the savings can be checked in /metrics.
+    """
+
+    def __init__(self, model, feature_names, buffer_rows=64):
+        self.booster = model.get_booster()
+        self.n_features = len(feature_names)
+        booster_names = self.booster.feature_names
+        if booster_names is not None and list(booster_names) != list(feature_names):
+            raise ValueError("Booster feature names do not match the model metadata")
+        if self.booster.num_features() != self.n_features:
+            raise ValueError(
+                f"Booster expects {self.booster.num_features()} features, metadata lists {self.n_features}"
+            )
+        # Respect early stopping the same way XGBRegressor.predict does
+        best = getattr(model, 'best_iteration', None)
+        self.iteration_range = (0, best + 1) if best is not None else (0, 0)
+        self.buffer_rows = buffer_rows
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.copies = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def _buffer(self, n):
+        buf = getattr(self._local, 'buffer', None)
+        if buf is None or buf.shape[0] < n:
+            buf = np.empty((max(n, self.buffer_rows), self.n_features), dtype=np.float32)
+            self._local.buffer = buf
+        return buf[:n]
+
+    def predict(self, X):
+        start = time.perf_counter()
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        copied = not (X.dtype == np.float32 and X.flags.c_contiguous)
+        if copied:
+            buf = self._buffer(len(X))
+            np.copyto(buf, X, casting='unsafe')
+            X = buf
+        predictions = self.booster.inplace_predict(
+            X,
+            iteration_range=self.iteration_range,
+            predict_type='value',
+            missing=np.nan,
+            validate_features=False,
+        )
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.rows += len(X)
+            self.copies += copied
+            self.total_seconds += elapsed
+            self.last_seconds = elapsed
+        # The buffer is reused by the next call on this thread
+        return np.array(predictions, dtype=np.float64)
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'buffer_copies': self.copies,
+            'avg_call_ms': self.total_seconds / self.calls * 1000 if self.calls else None,
+            'last_call_ms': self.last_seconds * 1000,
+        }
@@ -27,6 +27,35 @@ def test_features_returns_defaults_and_importance(api_client):
     assert isinstance(data["numerical_features"], list)
 
 
+@pytest.mark.unit
+def test_metadata_endpoints_revalidate_with_etag_until_models_reload(api_module, api_client, monkeypatch):
+    from src.model_registry import RegistrySnapshot
+
+    monkeypatch.setattr(api_module, "GZIP_MIN_SIZE", 100)  # the fake models' payloads are small
+    first = api_client.get("/features", headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert not etag.startswith("W/")
+    assert api_client.get("/features", headers={"If-None-Match": etag}).status_code == 304
+
+    zipped = api_client.get("/features", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers.get("content-encoding") == "gzip"
+    assert zipped.headers["etag"] != etag
+    assert zipped.json() == first.json()
+
+    models_etag = api_client.get("/models").headers["etag"]
+    assert api_client.get("/insights").status_code == 200
+    # A reload publishes a new snapshot, and with it new payloads
+    snapshot = api_module.registry.snapshot
+    models = {name: dict(entry) for name, entry in snapshot.models.items()}
+    for entry in models.values():
+        entry["version"] = "redeployed"
+    api_module.registry.snapshot = RegistrySnapshot(models, snapshot.generation + 1)
+    resp = api_client.get("/models", headers={"If-None-Match": models_etag})
+    assert resp.status_code == 200
+    assert {m["version"] for m in resp.json().values()} == {"redeployed"}
+
+
 @pytest.mark.unit
 def test_predict_default_model_selection(api_client):
     payload: Dict[str, Any] = {
@@ -54,3 +83,423 @@ def test_predict_bad_model_name_404(api_client):
     payload = {"features": {"LotArea": 9000}, "model_name": "does_not_exist"}
     resp = api_client.post("/predict", json=payload)
     assert resp.status_code == 404
+
+
+@pytest.mark.unit
+def test_predict_batch_preserves_order_and_missing(api_module, api_client):
+    class RowModel:
+        def predict(self, X):
+            # Echo LotArea so each row's output is distinguishable
+            return X[:, 0].astype(float)
+
+    api_module.registry.models["random_forest"]["model"] = RowModel()
+    payload = {
+        "instances": [
+            {"LotArea": 9000, "YearBuilt": 2000, "GrLivArea": 1600},
+            {"LotArea": 7000},
+            {"LotArea": 8000, "GrLivArea": 1500},
+        ],
+        "model_name": "random_forest",
+    }
+    resp = api_client.post("/predict/batch", json=payload)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["model_used"] == "random_forest"
+    assert [p["predicted_price"] for p in body["predictions"]] == [9000.0, 7000.0, 8000.0]
+    assert body["predictions"][0]["missing_features"] == []
+    assert body["predictions"][1]["missing_features"] == ["YearBuilt", "GrLivArea"]
+
+
+@pytest.mark.unit
+def test_predict_batch_arrow_round_trip(api_module, api_client):
+    pl = pytest.importorskip("polars")
+    import io
+
+    from src.categorical_encoder import CategoricalEncoder
+    from src.feature_layout import FeatureLayout
+
+    class RowModel:
+        def predict(self, X):
+            return X[:, 0] + X[:, 1]
+
+    encoder = CategoricalEncoder({"Neighborhood": ["CollgCr", "NAmes"]})
+    api_module.registry.models["random_forest"].update(
+        model=RowModel(), encoder=encoder,
+        layout=FeatureLayout(["LotArea", "Neighborhood_NAmes"], {"LotArea": 5000}, encoder),
+    )
+    buffer = io.BytesIO()
+    pl.DataFrame({"LotArea": [9000, None, 7000], "Neighborhood": ["NAmes", "CollgCr", None]}).write_ipc_stream(buffer)
+    arrow = "application/vnd.apache.arrow.stream"
+
+    resp = api_client.post(
+        "/predict/batch?model_name=random_forest&fields=price,missing",
+        content=buffer.getvalue(), headers={"Content-Type": arrow},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == arrow
+    assert resp.headers["x-model-used"] == "random_forest"
+    out = pl.read_ipc_stream(io.BytesIO(resp.content))
+    assert out["predicted_price"].to_list() == [9001.0, 5000.0, 7000.0]
+    assert out["missing_features"].to_list() == [[], ["LotArea"], ["Neighborhood_NAmes"]]
+
+    resp = api_client.post(
+        "/predict/batch?model_name=random_forest", content=buffer.getvalue(),
+        headers={"Content-Type": arrow, "Accept": "application/json"},
+    )
+    assert [p["predicted_price"] for p in resp.json()["predictions"]] == [9001.0, 5000.0, 7000.0]
+    assert api_client.post("/predict/batch", content=b"junk", headers={"Content-Type": arrow}).status_code == 400
+    assert api_client.post("/predict/batch", json={"model_name": "x"}).status_code == 422
+
+
+@pytest.mark.unit
+def test_predict_batch_arrow_nullable_boolean_matches_json(api_module, api_client):
+    pl = pytest.importorskip("polars")
+    import io
+
+    from src.columnar import read_arrow
+    from src.feature_layout import FeatureLayout
+
+    class RowModel:
+        def predict(self, X):
+            return X[:, 0] * 100 + X[:, 1]
+
+    api_module.registry.models["random_forest"].update(
+        model=RowModel(), layout=FeatureLayout(["CentralAir", "LotArea"], {"CentralAir": 0.5, "LotArea": 5000}),
+    )
+    buffer = io.BytesIO()
+    pl.DataFrame({"CentralAir": [True, None, False], "LotArea": [1, 2, 3]}).write_ipc_stream(buffer)
+    columns, _ = read_arrow(buffer.getvalue())
+    assert columns["CentralAir"].dtype == "float64"
+    resp = api_client.post(
+        "/predict/batch?model_name=random_forest&fields=price,missing", content=buffer.getvalue(),
+        headers={"Content-Type": "application/vnd.apache.arrow.stream", "Accept": "application/json"},
+    )
+    assert resp.status_code == 200
+    arrow = resp.json()["predictions"]
+    # true/false score as 1/0, as in JSON; a null falls back to the default like a numeric null
+    assert [p["predicted_price"] for p in arrow] == [101.0, 52.0, 3.0]
+    assert arrow[1]["missing_features"] == ["CentralAir"]
+    resp = api_client.post(
+        "/predict/batch?model_name=random_forest&fields=price,missing",
+        json={"instances": [{"CentralAir": True, "LotArea": 1}, {"CentralAir": False, "LotArea": 3}]},
+    )
+    assert resp.json()["predictions"] == [arrow[0], arrow[2]]
+
+
+@pytest.mark.unit
+def test_predict_batch_rejects_oversized_batch(api_module, api_client, monkeypatch):
+    monkeypatch.setattr(api_module, "MAX_BATCH_SIZE", 2)
+    payload = {"instances": [{"LotArea": 9000}] * 3}
+    resp = api_client.post("/predict/batch", json=payload)
+    assert resp.status_code == 413
+
+
+@pytest.mark.unit
+def test_predict_batch_rejects_oversized_body_before_parsing(api_module, api_client, monkeypatch):
+    def parse_batch_json(body):
+        raise AssertionError("oversized body was parsed")
+
+    monkeypatch.setattr(api_module, "MAX_BATCH_SIZE", 2)
+    monkeypatch.setattr(api_module, "MAX_BATCH_ROW_BYTES", 32)
+    monkeypatch.setattr(api_module, "parse_batch_json", parse_batch_json)
+    body = b'{"instances": [' + b", ".join([b'{"LotArea": 9000}'] * 10) + b"]}"
+    resp = api_client.post("/predict/batch", content=body, headers={"Content-Type": "application/json"})
+    assert resp.status_code == 413
+    # Chunked, without Content-Length
+    resp = api_client.post(
+        "/predict/batch", content=iter([body[:40], body[40:]]), headers={"Content-Type": "application/json"}
+    )
+    assert resp.status_code == 413
+
+
+@pytest.mark.unit
+def test_predict_stream_scores_ndjson_in_order_with_line_errors(api_module, api_client, monkeypatch):
+    import json
+
+    class RowModel:
+        def predict(self, X):
+            return X[:, 0].astype(float)
+
+    api_module.registry.models["random_forest"]["model"] = RowModel()
+    monkeypatch.setattr(api_module, "STREAM_CHUNK_SIZE", 2)
+    body = "\n".join([
+        json.dumps({"LotArea": 9000, "YearBuilt": 2000, "GrLivArea": 1600}),
+        "not json",
+        json.dumps({"LotArea": "big"}),
+        "",
+        json.dumps({"LotArea": 7000}),
+    ])
+    resp = api_client.post("/predict/stream?model_name=random_forest", content=body.encode())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert resp.headers["x-model-used"] == "random_forest"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["line"] for line in lines] == [1, 2, 3, 5]
+    assert lines[0] == {"line": 1, "predicted_price": 9000.0, "missing_features": []}
+    assert "error" in lines[1] and "error" in lines[2]
+    assert lines[3]["predicted_price"] == 7000.0
+    assert lines[3]["missing_features"] == ["YearBuilt", "GrLivArea"]
+
+    assert api_client.post("/predict/stream?model_name=nope", content=b"{}").status_code == 404
+
+
+@pytest.mark.unit
+def test_predict_accepts_raw_categorical_values(api_module, api_client):
+    from src.categorical_encoder import CategoricalEncoder
+    from src.feature_layout import FeatureLayout
+
+    class DummyEcho:
+        def predict(self, X):
+            return X[:, 1].astype(float)
+
+    encoder = CategoricalEncoder({"Neighborhood": ["CollgCr", "NAmes"]})
+    features = ["LotArea", "Neighborhood_NAmes"]
+    api_module.registry.models["random_forest"].update(
+        model=DummyEcho(), encoder=encoder, layout=FeatureLayout(features, {}, encoder)
+    )
+    payload = {"features": {"Neighborhood": "NAmes"}, "model_name": "random_forest"}
+    body = api_client.post("/predict", json=payload).json()
+    assert body["predicted_price"] == 1.0
+    assert body["missing_features"] == ["LotArea"]
+
+    payload["features"]["Neighborhood"] = "Atlantis"
+    assert api_client.post("/predict", json=payload).status_code == 422
+
+
+@pytest.fixture()
+def deferred_api_module(fake_models_fs, monkeypatch, request):
+    import importlib
+    import sys
+
+    monkeypatch.setenv("MODEL_LOADING", request.param)
+    monkeypatch.setenv("MODEL_RELOAD_INTERVAL", "0")
+    sys.modules.pop("src.api", None)
+    module = importlib.import_module("src.api")
+    yield module
+    sys.modules.pop("src.api", None)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("deferred_api_module", ["lazy"], indirect=True)
+def test_lazy_loading_defers_models_until_first_use(deferred_api_module):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(deferred_api_module.app)
+    assert client.get("/health").json()["models_loaded"] == 0
+    assert client.get("/ready").status_code == 503
+    assert client.post("/predict", json={"features": {"LotArea": 9000}}).status_code == 200
+    assert client.get("/ready").status_code == 200
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("deferred_api_module", ["lazy"], indirect=True)
+def test_lazy_loading_does_not_block_the_event_loop(deferred_api_module, monkeypatch):
+    import asyncio
+    import threading
+
+    import httpx
+
+    release = threading.Event()
+    original_load = deferred_api_module.registry.load
+
+    def slow_load():
+        release.wait(timeout=10)
+        return original_load()
+
+    monkeypatch.setattr(deferred_api_module.registry, "load", slow_load)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=deferred_api_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.ensure_future(client.post("/predict", json={"features": {"LotArea": 9000}}))
+            await asyncio.sleep(0.05)
+            # The model load is stuck in its thread; the loop still answers
+            assert (await client.get("/health")).status_code == 200
+            assert (await client.get("/ready")).status_code == 503
+            assert not pending.done()
+            release.set()
+            assert (await pending).status_code == 200
+            assert (await client.get("/ready")).status_code == 200
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("deferred_api_module", ["background"], indirect=True)
+def test_background_loading_reports_readiness(deferred_api_module):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(deferred_api_module.app)
+    assert client.post("/predict", json={"features": {"LotArea": 9000}}).status_code == 503
+    with TestClient(deferred_api_module.app) as running:
+        assert deferred_api_module.artifacts_ready.wait(timeout=10)
+        assert running.get("/ready").json()["ready"] is True
+        assert running.post("/predict", json={"features": {"LotArea": 9000}}).status_code == 200
+
+
+@pytest.mark.unit
+def test_reference_stats_artifact_skips_csv(fake_models_fs, fake_data_df, monkeypatch, tmp_path):
+    import importlib
+    import sys
+
+    from src.reference_stats import compute_reference_stats, save_reference_stats
+
+    path = tmp_path / "stats.json"
+    stats = compute_reference_stats(fake_data_df)
+    stats["defaults"]["LotArea"] = 12345.0
+    save_reference_stats(stats, path)
+    monkeypatch.setenv("REFERENCE_STATS_PATH", str(path))
+
+    def no_csv(*args, **kwargs):
+        raise AssertionError("raw CSV should not be read when the artifact exists")
+
+    monkeypatch.setattr("pandas.read_csv", no_csv)
+    sys.modules.pop("src.api", None)
+    try:
+        module = importlib.import_module("src.api")
+        assert module.feature_defaults["LotArea"] == 12345.0
+        assert module.saleprice_hist == stats["saleprice_histogram"]
+    finally:
+        sys.modules.pop("src.api", None)
+
+
+@pytest.mark.unit
+def test_repeated_predictions_hit_cache(api_module, api_client):
+    calls = []
+
+    class CountingModel:
+        def predict(self, X):
+            calls.append(len(X))
+            return X[:, 0].astype(float)
+
+    api_module.registry.models["random_forest"]["model"] = CountingModel()
+    payload = {"features": {"LotArea": 9000}, "model_name": "random_forest"}
+    assert api_client.post("/predict", json=payload).json()["predicted_price"] == 9000.0
+    assert api_client.post("/predict", json=payload).json()["predicted_price"] == 9000.0
+    batch = {"instances": [{"LotArea": 9000}, {"LotArea": 7000}], "model_name": "random_forest"}
+    prices = [p["predicted_price"] for p in api_client.post("/predict/batch", json=batch).json()["predictions"]]
+    assert prices == [9000.0, 7000.0]
+    # only the first quote and the one new batch row reached the model
+    assert calls == [1, 1]
+    stats = api_client.get("/metrics").json()["prediction_cache"]
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+
+@pytest.mark.unit
+def test_predict_returns_503_when_inference_queue_full(api_module, api_client, monkeypatch):
+    from src.inference_executor import ExecutorSaturated
+
+    async def saturated(fn, *args):
+        raise ExecutorSaturated("Inference queue full")
+
+    monkeypatch.setattr(api_module.micro_batcher, "runner", saturated)
+    resp = api_client.post("/predict", json={"features": {"LotArea": 1}})
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+@pytest.mark.unit
+def test_metrics_histograms_per_route_and_model(api_client):
+    payload = {"features": {"LotArea": 8123}, "model_name": "random_forest"}
+    assert api_client.post("/predict", json=payload).headers["x-model-used"] == "random_forest"
+    api_client.post("/predict", json={"features": {}, "model_name": "missing"})
+
+    histograms = api_client.get("/metrics").json()["histograms"]
+    assert histograms["http_request_duration_seconds"]["/predict/random_forest"]["count"] == 1
+    assert histograms["http_request_errors_total"]["/predict/404"] == 1
+    assert histograms["inference_duration_seconds"]["random_forest"]["count"] == 1
+    assert histograms["inference_batch_rows"]["random_forest"]["p50"] is not None
+
+    resp = api_client.get("/metrics?format=prometheus")
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{route="/predict",model="random_forest"} 1' in resp.text
+
+
+@pytest.mark.unit
+def test_predict_reports_stage_timings(api_client):
+    payload = {"features": {"LotArea": 8200}, "model_name": "random_forest"}
+    resp = api_client.post("/predict", json=payload)
+    stages = [part.split(";")[0] for part in resp.headers["server-timing"].split(", ")]
+    assert stages == ["parse", "features", "cache", "predict", "respond", "serialize", "total"]
+    assert "timings" not in resp.json()
+
+    body = api_client.post("/predict?debug=true", json=payload).json()
+    assert set(body["timings"]) == {"parse", "features", "cache", "predict", "respond"}
+    summary = api_client.get("/metrics").json()["histograms"]["request_stage_duration_seconds"]
+    assert summary["/predict/predict"]["count"] == 2
+
+
+@pytest.mark.unit
+def test_sampled_request_succeeds_when_another_profiler_is_active(api_module, api_client, monkeypatch):
+    import cProfile
+
+    from src import profiling
+    from src.profiling import ProfileSampler
+
+    class BusyProfile(cProfile.Profile):
+        # What Python 3.12+ raises when sys.monitoring's profiler slot is taken
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", BusyProfile)
+    monkeypatch.setattr(api_module, "profile_sampler", ProfileSampler(sample_every=1))
+    resp = api_client.post("/predict", json={"features": {"LotArea": 8300}, "model_name": "random_forest"})
+    assert resp.status_code == 200
+    profiles = api_client.get("/admin/profiles").json()["profiles"]
+    assert profiles[0]["status"] == 200 and profiles[0]["profiled_calls"] == 0
+    assert profiles[0]["handler_profiled"] is False
+
+
+@pytest.mark.unit
+def test_sampled_profiles_downloadable_from_admin(api_module, api_client, monkeypatch):
+    import marshal
+
+    from src.profiling import ProfileSampler
+
+    monkeypatch.setattr(api_module, "profile_sampler", ProfileSampler(sample_every=2))
+    for area in (8000, 8100, 8200):
+        resp = api_client.post("/predict", json={"features": {"LotArea": area}, "model_name": "random_forest"})
+        assert resp.status_code == 200
+    profiles = api_client.get("/admin/profiles").json()["profiles"]
+    assert len(profiles) == 1 and profiles[0]["path"] == "/predict"
+    assert profiles[0]["status"] == 200 and profiles[0]["profiled_calls"] == 1
+    assert profiles[0]["handler_profiled"] is True
+
+    resp = api_client.get(f"/admin/profiles/{profiles[0]['id']}")
+    stats = marshal.loads(resp.content)
+    # The whole request path: the endpoint, its response rendering and the model call
+    assert any(file.endswith("api.py") and func == "predict" for file, _, func in stats)
+    assert any(file.endswith("responses.py") and func == "render" for file, _, func in stats)
+    assert any(not file.endswith("api.py") and func == "predict" for file, _, func in stats)
+    assert "function calls" in api_client.get(f"/admin/profiles/{profiles[0]['id']}?format=text").text
+
+    monkeypatch.setattr(api_module, "ADMIN_TOKEN", "secret")
+    assert api_client.get("/admin/profiles").status_code == 403
+    assert api_client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).status_code == 200
+
+
+@pytest.mark.unit
+def test_predict_fields_select_compact_response(api_client):
+    payload = {"features": {"LotArea": 8300}, "model_name": "random_forest"}
+    body = api_client.post("/predict?fields=price,model", json=payload).json()
+    assert set(body) == {"predicted_price", "model_used"}
+    full = api_client.post("/predict", json=payload).json()
+    assert body["predicted_price"] == full["predicted_price"]
+    assert {"features_used", "missing_features", "confidence_metrics"} <= set(full)
+    assert api_client.post("/predict?fields=price,bogus", json=payload).status_code == 422
+
+    batch = {"instances": [{"LotArea": 8300}, {"LotArea": 9100}], "model_name": "random_forest"}
+    body = api_client.post("/predict/batch?fields=price", json=batch).json()
+    assert body == {"predictions": [{"predicted_price": p["predicted_price"]} for p in body["predictions"]]}
+
+
+@pytest.mark.unit
+def test_large_responses_are_gzipped(api_module, api_client):
+    resp = api_client.post(
+        "/predict/batch", json={"instances": [{"LotArea": 8000 + i} for i in range(200)]},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.headers.get("content-encoding") == "gzip"
+    assert len(resp.json()["predictions"]) == 200
+    small = api_client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
@@ -40,9 +40,13 @@ def fake_data_df():
 
 
 @pytest.fixture()
-def fake_models_fs(monkeypatch, fake_data_df):
+def fake_models_fs(monkeypatch, fake_data_df, tmp_path):
     """Monkeypatch filesystem and loaders so importing src.api uses fake models and data."""
 
+    # No precomputed statistics artifact: defaults come from the fake CSV below
+    monkeypatch.setenv("REFERENCE_STATS_PATH", str(tmp_path / "reference_stats.json"))
+    monkeypatch.setenv("PREPROCESSOR_PATH", str(tmp_path / "preprocessor.json"))
+
     # Fake files in models dir
     def fake_listdir(path):
         # Two models present
@@ -67,7 +71,7 @@ def fake_models_fs(monkeypatch, fake_data_df):
     )
 
     # joblib.load behavior depends on path
-    def fake_joblib_load(path):
+    def fake_joblib_load(path, mmap_mode=None):
         path_str = str(path)
         if path_str.endswith("random_forest.joblib") and "_metadata" not in path_str:
             return rf_model
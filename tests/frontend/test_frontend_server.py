@@ -20,3 +20,67 @@ def test_frontend_static_route_exists():
     resp = client.get("/static/")
     # Directory listing might be disabled; 200 or 404 are acceptable as long as no exception occurs
     assert resp.status_code in (200, 404)
+
+
+def test_frontend_serves_fingerprinted_precompressed_assets():
+    import os
+    import re
+
+    from frontend.server import frontend_app
+
+    client = TestClient(frontend_app)
+    index = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert index.headers["cache-control"] == "no-cache"
+    assert client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": index.headers["etag"]}).status_code == 304
+
+    script = re.search(r'src="static/(script\.[0-9a-f]{12}\.js)"', index.text).group(1)
+    resp = client.get(f"/static/{script}", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    from frontend.routes import static_dir
+
+    with open(os.path.join(static_dir, "script.js"), "rb") as f:
+        assert resp.content == f.read()
+
+    # Unhashed names still work but are revalidated
+    assert client.get("/static/script.js").headers["cache-control"] == "no-cache"
+
+
+def test_combined_app_serves_dashboard_and_api_on_one_origin(api_module):
+    import time
+
+    from frontend.combined import create_app
+
+    with TestClient(create_app()) as client:
+        index = client.get("/")
+        assert index.status_code == 200
+        # The page calls the API on its own origin
+        assert '<meta name="api-base" content="">' in index.text
+        for _ in range(100):
+            if client.get("/health").status_code == 200:
+                break
+            time.sleep(0.05)
+        assert client.get("/features").status_code == 200
+        assert client.post("/predict", json={"features": {"LotArea": 8000}}).status_code == 200
+
+
+def test_combined_app_reports_a_failed_api_import(monkeypatch):
+    import time
+
+    from frontend.combined import DeferredAPI, create_app
+
+    def broken():
+        raise ImportError("No module named 'orjson'")
+
+    monkeypatch.setattr(DeferredAPI, "import_api", staticmethod(broken))
+    with TestClient(create_app()) as client:
+        for _ in range(100):
+            resp = client.get("/health")
+            if resp.status_code != 503:
+                break
+            time.sleep(0.05)
+        assert resp.status_code == 500
+        assert resp.json() == {"detail": "API failed to start: No module named 'orjson'"}
+        assert client.get("/").status_code == 200
@@ -0,0 +1,118 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+
+from src import bulk_score
+from src.reference_stats import compute_reference_stats, save_reference_stats
+
+
+@pytest.fixture
+def job(tmp_path, fake_data_df):
+    X = np.array([[5000.0, 1950.0], [9000.0, 1990.0], [12000.0, 2005.0]])
+    model = DecisionTreeRegressor(random_state=0).fit(X, [100000.0, 200000.0, 300000.0])
+    joblib.dump(model, tmp_path / "tree.joblib")
+    joblib.dump({"metrics": {"mae": 1.0}, "features": ["LotArea", "YearBuilt"]}, tmp_path / "tree_metadata.joblib")
+    save_reference_stats(compute_reference_stats(fake_data_df), tmp_path / "reference_stats.json")
+
+    listings = pd.DataFrame({
+        "PID": np.arange(25) + 1000,
+        "LotArea": np.where(np.arange(25) % 2, 12000.0, 5000.0),
+        "YearBuilt": 2005.0,
+    })
+    listings.loc[3, "LotArea"] = np.nan  # empty cell -> default, like an omitted field
+    listings.to_csv(tmp_path / "listings.csv", index=False)
+    expected = model.predict(np.column_stack([
+        listings["LotArea"].fillna(fake_data_df["LotArea"].median()), listings["YearBuilt"],
+    ]))
+    return tmp_path, expected
+
+
+def _run(tmp_path, **kwargs):
+    return bulk_score.run(
+        str(tmp_path / "listings.csv"), str(tmp_path / "out.csv"), key="PID", chunk_size=10,
+        models_dir=str(tmp_path), log=lambda msg: None, **kwargs,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scores_in_chunks_with_row_keys(job, workers):
+    tmp_path, expected = job
+    progress = _run(tmp_path, workers=workers)
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert list(out.columns) == ["PID", "predicted_price"]
+    assert out["PID"].tolist() == list(range(1000, 1025))
+    np.testing.assert_allclose(out["predicted_price"], expected)
+    assert progress["chunks"] == 3 and progress["rows"] == 25
+
+
+@pytest.mark.unit
+def test_resume_continues_after_last_completed_chunk(job):
+    tmp_path, expected = job
+    _run(tmp_path, workers=1)
+    # Simulate a crash while writing the third chunk
+    progress_path = tmp_path / "out.csv.progress.json"
+    progress = json.loads(progress_path.read_text())
+    lines = (tmp_path / "out.csv").read_bytes().splitlines(keepends=True)
+    kept = b"".join(lines[:21])
+    (tmp_path / "out.csv").write_bytes(kept + b"1020,12")
+    progress.update(chunks=2, rows=20, output_bytes=len(kept))
+    progress_path.write_text(json.dumps(progress))
+
+    progress = _run(tmp_path, workers=1, resume=True)
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert out["PID"].tolist() == list(range(1000, 1025))
+    np.testing.assert_allclose(out["predicted_price"], expected)
+    assert progress["rows"] == 25
+
+
+@pytest.mark.unit
+def test_bad_rows_are_rejected_without_stopping_the_job(job):
+    tmp_path, expected = job
+    listings = pd.read_csv(tmp_path / "listings.csv")
+    listings["LotArea"] = listings["LotArea"].astype(object)
+    listings.loc[12, "LotArea"] = "big"
+    listings.to_csv(tmp_path / "listings.csv", index=False)
+
+    progress = _run(tmp_path, workers=1)
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert out["PID"].tolist() == list(range(1000, 1025))
+    assert np.isnan(out.loc[12, "predicted_price"])
+    good = out.index != 12
+    np.testing.assert_allclose(out.loc[good, "predicted_price"], expected[good])
+    rejects = pd.read_csv(tmp_path / "out.csv.rejects.csv")
+    assert rejects["PID"].tolist() == [1012]
+    assert "LotArea" in rejects.loc[0, "error"]
+    assert progress["rejected"] == 1
+
+
+@pytest.mark.unit
+def test_defaults_use_saved_preprocessor_like_the_api(job):
+    from src.preprocessor import Preprocessor
+
+    tmp_path, _ = job
+    preprocessor = Preprocessor({"LotArea": 12000.0}, {"LotArea": "float64"}, ["LotArea"], {})
+    preprocessor.save(tmp_path / "preprocessor.json")
+
+    _run(tmp_path, workers=1)
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    # Row 3 has an empty LotArea: filled with the preprocessor's value, not the stats median
+    assert out.loc[3, "predicted_price"] == out.loc[1, "predicted_price"]
+
+
+@pytest.mark.unit
+def test_resume_without_output_starts_from_first_row(job):
+    tmp_path, expected = job
+    _run(tmp_path, workers=1)
+    (tmp_path / "out.csv").unlink()  # progress file left behind, output gone
+
+    progress = _run(tmp_path, workers=1, resume=True)
+
+    assert progress["rows"] == 25
+    np.testing.assert_allclose(pd.read_csv(tmp_path / "out.csv")["predicted_price"], expected)
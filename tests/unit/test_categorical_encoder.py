@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from src.categorical_encoder import CategoricalEncoder
+from src.feature_layout import FeatureLayout
+
+
+def _df():
+    return pd.DataFrame(
+        {
+            "LotArea": [8000, 9000, 10000, 11000],
+            "Neighborhood": ["NAmes", "CollgCr", "NAmes", "Edwards"],
+            "Street": ["Pave", "Grvl", "Pave", None],
+        }
+    )
+
+
+@pytest.mark.unit
+def test_transform_matches_get_dummies_drop_first():
+    df = _df().fillna({"Street": "Pave"})
+    encoder = CategoricalEncoder.fit(df)
+    expected = pd.get_dummies(df, columns=["Neighborhood", "Street"], drop_first=True)
+    result = encoder.transform(df)
+    assert list(result.columns) == list(expected.columns)
+    assert (result.to_numpy() == expected.to_numpy()).all()
+
+
+@pytest.mark.unit
+def test_codes_are_vectorized_and_flag_unknowns():
+    encoder = CategoricalEncoder.fit(_df())
+    assert encoder.categories["Neighborhood"] == ["CollgCr", "Edwards", "NAmes"]
+    assert encoder.codes("Neighborhood", ["NAmes", "Nowhere", "CollgCr"]).tolist() == [2, -1, 0]
+
+
+@pytest.mark.unit
+def test_save_load_roundtrip(tmp_path):
+    encoder = CategoricalEncoder.fit(_df())
+    path = tmp_path / "model_encoder.joblib"
+    encoder.save(path)
+    assert CategoricalEncoder.load(path).categories == encoder.categories
+
+
+@pytest.mark.unit
+def test_layout_encodes_raw_categories_and_defaults():
+    encoder = CategoricalEncoder.fit(_df())
+    features = ["LotArea", "Neighborhood_Edwards", "Neighborhood_NAmes", "Street_Pave"]
+    layout = FeatureLayout(features, {"LotArea": 9000.0, "Neighborhood": "NAmes", "Street": "Pave"}, encoder)
+    # string defaults are one-hot encoded into the template
+    assert layout.template.tolist() == [9000.0, 0.0, 1.0, 1.0]
+
+    X, missing = layout.vector({"Neighborhood": "CollgCr"})
+    assert X[0].tolist() == [9000.0, 0.0, 0.0, 1.0]  # baseline category: all dummies 0
+    assert missing == ["LotArea", "Street_Pave"]
+
+    X, missing = layout.matrix([{"Neighborhood": "Edwards"}, {"Street": "Grvl", "LotArea": 1}])
+    assert X.tolist() == [[9000.0, 1.0, 0.0, 1.0], [1.0, 0.0, 1.0, 0.0]]
+    assert missing == [["LotArea", "Street_Pave"], ["Neighborhood_Edwards", "Neighborhood_NAmes"]]
+
+    with pytest.raises(ValueError):
+        layout.vector({"Neighborhood": "Nowhere"})
+    with pytest.raises(ValueError):
+        layout.matrix([{"Neighborhood": "Nowhere"}])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.feature_layout import FeatureLayout
+
+
+def _layout():
+    return FeatureLayout(["LotArea", "YearBuilt", "Neighborhood_NAmes"], {"LotArea": 9000.0, "YearBuilt": 2000.0})
+
+
+@pytest.mark.unit
+def test_template_uses_defaults_in_model_order():
+    layout = _layout()
+    assert layout.template.dtype == np.float32
+    assert layout.template.tolist() == [9000.0, 2000.0, 0.0]
+    assert layout.index["Neighborhood_NAmes"] == 2
+
+
+@pytest.mark.unit
+def test_vector_overwrites_only_supplied_fields():
+    layout = _layout()
+    X, missing = layout.vector({"YearBuilt": 1990, "Unknown": 5})
+    assert X.shape == (1, 3)
+    assert X[0].tolist() == [9000.0, 1990.0, 0.0]
+    assert missing == ["LotArea", "Neighborhood_NAmes"]
+    # the shared template is never mutated
+    assert layout.template.tolist() == [9000.0, 2000.0, 0.0]
+
+
+@pytest.mark.unit
+def test_matrix_and_bad_values():
+    layout = _layout()
+    X, missing = layout.matrix([{"LotArea": 1}, {"Neighborhood_NAmes": 1}])
+    assert X.tolist() == [[1.0, 2000.0, 0.0], [9000.0, 2000.0, 1.0]]
+    assert missing[1] == ["LotArea", "YearBuilt"]
+    with pytest.raises(ValueError):
+        layout.vector({"LotArea": "big"})
+
+
+@pytest.mark.unit
+def test_missing_features_skipped_when_not_requested():
+    layout = _layout()
+    X, missing = layout.vector({"YearBuilt": 1990}, with_missing=False)
+    assert X[0].tolist() == [9000.0, 1990.0, 0.0]
+    assert missing is None
+    X, missing = layout.matrix([{"LotArea": 1}], with_missing=False)
+    assert X.tolist() == [[1.0, 2000.0, 0.0]]
+    assert missing is None
+
+
+@pytest.mark.unit
+def test_frame_matches_matrix_and_defaults_empty_cells():
+    pd = pytest.importorskip("pandas")
+    layout = _layout()
+    df = pd.DataFrame({"LotArea": [7000.0, np.nan], "YearBuilt": [1990, 2010], "Other": ["x", "y"]})
+    X, mask = layout.frame(df)
+    expected, _ = layout.matrix([{"LotArea": 7000.0, "YearBuilt": 1990}, {"YearBuilt": 2010}])
+    np.testing.assert_array_equal(X, expected)
+    assert mask.tolist() == [[True, True, False], [False, True, False]]
+    with pytest.raises(ValueError):
+        layout.frame(pd.DataFrame({"LotArea": ["big"]}))
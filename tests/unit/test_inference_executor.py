@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from src.inference_executor import ExecutorSaturated, InferenceExecutor, configure_model_threads
+
+
+@pytest.mark.unit
+def test_run_executes_off_the_event_loop_thread():
+    executor = InferenceExecutor(max_workers=2, max_queue=0)
+
+    async def main():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    assert asyncio.run(main()).startswith("inference")
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.unit
+def test_full_queue_is_rejected():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(main())
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.unit
+def test_waiting_callers_get_slots_in_order_instead_of_failing():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+    order = []
+
+    async def main():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        waiting = [asyncio.ensure_future(executor.run(order.append, i, wait=True)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert not any(w.done() for w in waiting)
+        assert executor.stats()["waiting"] == 3
+        release.set()
+        await asyncio.gather(blocked, *waiting)
+
+    asyncio.run(main())
+    assert order == [0, 1, 2]
+    assert executor.stats()["rejected"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.unit
+def test_cancelled_waiter_does_not_hold_up_the_queue():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        cancelled = asyncio.ensure_future(executor.run(lambda: None, wait=True))
+        waiting = asyncio.ensure_future(executor.run(lambda: "ran", wait=True))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        assert await asyncio.wait_for(waiting, timeout=5) == "ran"
+        await blocked
+
+    asyncio.run(main())
+    executor.shutdown()
+
+
+@pytest.mark.unit
+def test_configure_model_threads_sets_n_jobs():
+    model = configure_model_threads(RandomForestRegressor(n_jobs=-1), 2)
+    assert model.n_jobs == 2
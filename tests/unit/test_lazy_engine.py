@@ -0,0 +1,130 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+
+from src import lazy_engine  # noqa: E402
+from src.data_preprocessing import check_data_quality, prepare_data  # noqa: E402
+from src.preprocessor import Preprocessor  # noqa: E402
+from src.reference_stats import compute_reference_stats  # noqa: E402
+
+
+@pytest.fixture()
+def raw_csv(tmp_path):
+    """Mixed-type CSV with pandas NA tokens, an int column with gaps, an empty column and a duplicate row"""
+    rows = 40
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Order": np.arange(rows),
+            "Lot Area": rng.integers(5000, 15000, rows),
+            "Lot Frontage": rng.integers(40, 120, rows).astype(object),
+            "Mas Vnr Area": rng.normal(100, 50, rows).round(1),
+            "Alley": rng.choice(["Grvl", "Pave", "NA"], rows),
+            "Mas Vnr Type": rng.choice(["BrkFace", "None", "Stone"], rows),
+            "Pool QC": [""] * rows,
+            "SalePrice": rng.integers(100_000, 250_000, rows),
+        }
+    )
+    df.loc[[3, 7], "Lot Frontage"] = "NA"
+    df.loc[5, "SalePrice"] = 2_000_000
+    df.loc[rows - 1] = df.loc[rows - 2]
+    path = tmp_path / "raw.csv"
+    df.drop(columns="Order").to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.unit
+def test_fit_matches_pandas_preprocessor(raw_csv):
+    expected = Preprocessor.fit(pd.read_csv(raw_csv))
+
+    fitted = lazy_engine.fit(raw_csv)
+
+    assert fitted.to_dict() == expected.to_dict()
+    assert list(fitted.fill_values) == list(expected.fill_values)
+
+
+@pytest.mark.unit
+def test_null_only_in_an_outlier_row_sets_the_dtype(raw_csv, tmp_path):
+    df = pd.read_csv(raw_csv)
+    # Written as whole numbers with one empty cell, in row 5: the SalePrice outlier
+    df["Year Built"] = pd.array(np.arange(len(df)) + 1950, dtype="Int64")
+    df.loc[5, "Year Built"] = pd.NA
+    path = tmp_path / "outlier_null.csv"
+    df.to_csv(path, index=False)
+
+    expected = Preprocessor.fit(pd.read_csv(path))
+    fitted = lazy_engine.fit(path)
+    assert fitted.dtypes["Year Built"] == expected.dtypes["Year Built"] == "float64"
+    assert fitted.to_dict() == expected.to_dict()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pd.testing.assert_frame_equal(prepare_data(path, engine="polars"), prepare_data(pd.read_csv(path)))
+    stats = lazy_engine.reference_stats(path, source_name="raw.csv")
+    reference = compute_reference_stats(pd.read_csv(path), source="raw.csv")
+    assert stats["dtypes"] == reference["dtypes"]
+    assert stats["defaults"] == reference["defaults"]
+
+
+@pytest.mark.unit
+def test_load_types_columns_from_every_row(raw_csv, tmp_path):
+    empty_in_sample = {"Pool Area": [None] * 6 + [512], "Pool QC": [None] * 6 + ["Ex"]}
+    cases = [
+        empty_in_sample,
+        # values that don't parse as the sampled type: the file is re-read
+        dict(empty_in_sample, **{"Lot Area": [8000] * 6 + [8000.5]}),
+        dict(empty_in_sample, **{"Alley": ["1"] * 6 + ["Pave"]}),
+    ]
+    for i, columns in enumerate(cases):
+        path = tmp_path / f"late{i}.csv"
+        pd.DataFrame(columns).to_csv(path, index=False)
+
+        loaded = lazy_engine.load(path, sample_rows=3)
+
+        assert lazy_engine.pandas_dtypes(loaded) == {c: str(d) for c, d in pd.read_csv(path).dtypes.items()}
+        assert loaded.collect().get_column("Pool Area").to_list() == [None] * 6 + [512]
+    # A small sample, or reading from disk on every query, gives the same fit
+    expected = Preprocessor.fit(pd.read_csv(raw_csv)).to_dict()
+    assert lazy_engine.fit(lazy_engine.load(raw_csv, sample_rows=3)).to_dict() == expected
+    assert lazy_engine.fit(lazy_engine.scan(raw_csv)).to_dict() == expected
+
+
+@pytest.mark.unit
+def test_prepare_data_polars_engine_matches_pandas(raw_csv):
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = prepare_data(pd.read_csv(raw_csv))
+        result = prepare_data(raw_csv, engine="polars")
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert 5 not in result.index  # the outlier row is trimmed, labels kept
+
+
+@pytest.mark.unit
+def test_sink_csv_writes_the_same_file_as_clean(raw_csv, tmp_path):
+    df = pd.read_csv(raw_csv)
+    preprocessor = Preprocessor.fit(df)
+    preprocessor.transform(preprocessor.filter_outliers(df)).to_csv(tmp_path / "pandas.csv", index=False)
+
+    lazy_engine.sink_csv(lazy_engine.transform(raw_csv, preprocessor), tmp_path / "polars.csv")
+
+    assert (tmp_path / "polars.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes()
+
+
+@pytest.mark.unit
+def test_quality_report_and_reference_stats_match_pandas(raw_csv):
+    df = pd.read_csv(raw_csv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = check_data_quality(df)
+        report = check_data_quality(raw_csv, engine="polars")
+
+    pd.testing.assert_series_equal(report["missing"], expected["missing"])
+    assert report["duplicates"] == expected["duplicates"] == 1
+
+    stats = lazy_engine.reference_stats(raw_csv, source_name="raw.csv")
+    reference = compute_reference_stats(df, source="raw.csv")
+    for key in ("n_rows", "defaults", "dtypes", "quantiles", "saleprice_histogram"):
+        assert stats[key] == reference[key]
@@ -0,0 +1,45 @@
+import pytest
+
+from src.metrics import MetricsRegistry
+
+
+def _registry(**kwargs):
+    registry = MetricsRegistry(**kwargs)
+    latency = registry.histogram("latency_seconds", "Latency", ("model",), buckets=(0.1, 1.0))
+    errors = registry.counter("errors_total", "Errors", ("status",))
+    return registry, latency, errors
+
+
+@pytest.mark.unit
+def test_histogram_buckets_quantiles_and_prometheus_text():
+    registry, latency, errors = _registry()
+    for value in (0.05, 0.05, 0.5, 5.0):
+        latency.observe(value, model="xgboost")
+    errors.inc(status=404)
+    errors.inc(status=404)
+
+    summary = registry.summary()
+    xgb = summary["latency_seconds"]["xgboost"]
+    assert xgb["count"] == 4 and xgb["sum"] == pytest.approx(5.6)
+    assert xgb["p50"] == pytest.approx(0.1)
+    assert xgb["p99"] == pytest.approx(1.0)  # beyond the last bucket: clamped
+    assert summary["errors_total"] == {"404": 2}
+
+    text = registry.render_prometheus()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{model="xgboost",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{model="xgboost",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{model="xgboost",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{model="xgboost"} 4' in text
+    assert 'errors_total{status="404"} 2' in text
+
+
+@pytest.mark.unit
+def test_multiprocess_dir_sums_all_workers(tmp_path):
+    worker, latency, _ = _registry(multiprocess_dir=str(tmp_path))
+    latency.observe(0.05, model="rf")
+    worker.flush(force=True)
+    # Another worker with the same observation, as written by its own flush()
+    (own,) = tmp_path.iterdir()
+    (tmp_path / "99999.json").write_text(own.read_text())
+    assert worker.summary()["latency_seconds"]["rf"]["count"] == 2
@@ -0,0 +1,58 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.micro_batching import MicroBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(X.shape[0])
+        return X[:, 0] * 2
+
+
+def _rows(n):
+    return [np.array([float(i), 0.0], dtype=np.float32) for i in range(n)]
+
+
+@pytest.mark.unit
+def test_concurrent_rows_share_one_predict_call():
+    model = RecordingModel()
+    batcher = MicroBatcher(max_batch_size=32, max_wait=0.01)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("m", model.predict, r) for r in _rows(5)))
+
+    assert asyncio.run(main()) == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert model.calls == [5]
+    assert batcher.stats()["batch_size_counts"] == {"5": 1}
+
+
+@pytest.mark.unit
+def test_batches_are_capped_at_max_size():
+    model = RecordingModel()
+    batcher = MicroBatcher(max_batch_size=4, max_wait=0.01)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("m", model.predict, r) for r in _rows(10)))
+
+    assert asyncio.run(main()) == [float(2 * i) for i in range(10)]
+    assert sorted(model.calls) == [2, 4, 4]
+
+
+@pytest.mark.unit
+def test_errors_reach_every_caller():
+    batcher = MicroBatcher(max_batch_size=8)
+
+    def broken(X):
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("m", broken, r) for r in _rows(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,108 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.dummy import DummyRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from src.model_registry import ModelRegistry
+
+FEATURES = ["LotArea", "YearBuilt"]
+
+
+def _write_model(models_dir, name, model, mae, bump=0):
+    X = np.array([[1.0, 0.0], [2.0, 1.0], [3.0, 0.0], [4.0, 1.0]])
+    model.fit(X, X[:, 0] * 10)
+    joblib.dump(model, models_dir / f"{name}.joblib")
+    joblib.dump({"metrics": {"test": {"mae": mae}}, "features": FEATURES}, models_dir / f"{name}_metadata.joblib")
+    for suffix in (".joblib", "_metadata.joblib"):
+        path = models_dir / f"{name}{suffix}"
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+
+@pytest.mark.unit
+def test_load_precomputes_best_model_and_ranking(tmp_path):
+    _write_model(tmp_path, "tree", DecisionTreeRegressor(random_state=0), mae=100.0)
+    _write_model(tmp_path, "dummy", DummyRegressor(), mae=500.0)
+    registry = ModelRegistry(str(tmp_path), {})
+    snapshot = registry.load()
+    assert snapshot.best_model == "tree"
+    ranking = snapshot.models["tree"]["importance_ranking"]
+    assert ranking[0][0] == "LotArea"
+    assert [v for _, v in ranking] == sorted((v for _, v in ranking), reverse=True)
+    assert snapshot.models["dummy"]["importance_ranking"] == []
+
+
+@pytest.mark.unit
+def test_reload_swaps_changed_models_once_stable(tmp_path):
+    _write_model(tmp_path, "tree", DecisionTreeRegressor(random_state=0), mae=100.0)
+    _write_model(tmp_path, "dummy", DummyRegressor(), mae=500.0)
+    registry = ModelRegistry(str(tmp_path), {})
+    first = registry.load()
+    assert registry.reload_if_changed() is False
+
+    _write_model(tmp_path, "dummy", DummyRegressor(), mae=50.0, bump=10**9)
+    # first observation only marks the change as pending
+    assert registry.reload_if_changed() is False
+    assert registry.snapshot is first
+    assert registry.reload_if_changed() is True
+
+    second = registry.snapshot
+    assert second.generation == first.generation + 1
+    assert second.best_model == "dummy"
+    # unchanged artifacts are reused, not reloaded
+    assert second.models["tree"] is first.models["tree"]
+    assert first.best_model == "tree"
+
+
+@pytest.mark.unit
+def test_failed_reload_keeps_previous_snapshot(tmp_path):
+    _write_model(tmp_path, "tree", DecisionTreeRegressor(random_state=0), mae=100.0)
+    registry = ModelRegistry(str(tmp_path), {})
+    first = registry.load()
+    (tmp_path / "broken.joblib").write_bytes(b"not a pickle")
+    registry.reload_if_changed()
+    assert registry.reload_if_changed() is False
+    assert registry.snapshot is first
+
+
+@pytest.mark.unit
+def test_engine_override_builds_flat_engine(tmp_path):
+    from sklearn.ensemble import RandomForestRegressor
+
+    from src.tree_engine import FlatEnsemble
+
+    _write_model(tmp_path, "forest", RandomForestRegressor(n_estimators=3, random_state=0), mae=100.0)
+    _write_model(tmp_path, "dummy", DummyRegressor(), mae=500.0)
+    registry = ModelRegistry(str(tmp_path), {}, engine_overrides={"forest": "numpy", "dummy": "numpy"})
+    models = registry.load().models
+    assert isinstance(models["forest"]["engine"], FlatEnsemble)
+    # unsupported models fall back to native predict
+    assert models["dummy"]["engine"] is None
+
+
+@pytest.mark.unit
+def test_write_during_load_is_picked_up_by_the_next_reload(tmp_path, monkeypatch):
+    from src import model_registry
+
+    _write_model(tmp_path, "tree", DecisionTreeRegressor(random_state=0), mae=100.0)
+    registry = ModelRegistry(str(tmp_path), {})
+    real_load = joblib.load
+
+    def load_then_overwrite(path, **kwargs):
+        obj = real_load(path, **kwargs)
+        if str(path).endswith("tree.joblib"):
+            # a new model lands while the old one is being read
+            _write_model(tmp_path, "tree", DummyRegressor(), mae=100.0, bump=10**9)
+        return obj
+
+    monkeypatch.setattr(model_registry.joblib, "load", load_then_overwrite)
+    first = registry.load()
+    monkeypatch.setattr(model_registry.joblib, "load", real_load)
+    assert isinstance(first.models["tree"]["model"], DecisionTreeRegressor)
+
+    assert registry.reload_if_changed() is False
+    assert registry.reload_if_changed() is True
+    assert isinstance(registry.snapshot.models["tree"]["model"], DummyRegressor)
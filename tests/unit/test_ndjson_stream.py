@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from src.ndjson_stream import LineError, iter_ndjson
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def _collect(*parts, **kwargs):
+    async def run():
+        return [item async for item in iter_ndjson(_chunks(*parts), **kwargs)]
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_lines_split_across_chunks_and_blank_lines():
+    items = _collect(b'{"a": 1}\n{"a"', b': 2}\n\n[1]\n{"a": 3}')
+    assert [n for n, _ in items] == [1, 2, 4, 5]
+    assert items[0][1] == {"a": 1} and items[1][1] == {"a": 2} and items[3][1] == {"a": 3}
+    assert isinstance(items[2][1], LineError)
+
+
+@pytest.mark.unit
+def test_oversized_line_is_reported_and_skipped():
+    items = _collect(b'{"a": "' + b"x" * 40, b"x" * 40 + b'"}\n{"b": 1}\n', max_line_bytes=32)
+    assert isinstance(items[0][1], LineError)
+    assert items[1] == (2, {"b": 1})
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _row(*values):
+    return np.array(values, dtype=np.float32)
+
+
+@pytest.mark.unit
+def test_key_depends_on_model_version_and_vector():
+    row = _row(1, 2, 3)
+    assert PredictionCache.key("v1", row) == PredictionCache.key("v1", row.copy())
+    assert PredictionCache.key("v1", row) != PredictionCache.key("v2", row)
+    assert PredictionCache.key("v1", row) != PredictionCache.key("v1", _row(1, 2, 4))
+
+
+@pytest.mark.unit
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_entries=2)
+    cache.put(b"a", 1.0)
+    cache.put(b"b", 2.0)
+    assert cache.get(b"a") == 1.0  # a is now most recently used
+    cache.put(b"c", 3.0)
+    assert cache.get(b"b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 1, 1, 2)
+
+
+@pytest.mark.unit
+def test_ttl_and_byte_limit():
+    clock = FakeClock()
+    entry = PredictionCache.entry_bytes(bytes([0]), 0.0)
+    cache = PredictionCache(max_entries=100, max_bytes=3 * entry, ttl=10, clock=clock)
+    for i in range(5):
+        cache.put(bytes([i]), float(i))
+    assert cache.stats()["entries"] == 3
+    assert cache.stats()["bytes"] == 3 * entry
+    clock.now = 11
+    assert cache.get(bytes([4])) is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.unit
+def test_disabled_cache_never_stores():
+    cache = PredictionCache(max_entries=0)
+    cache.put(b"a", 1.0)
+    assert cache.get(b"a") is None
+    assert cache.stats()["enabled"] is False
+
+
+@pytest.mark.unit
+def test_byte_limit_counts_large_values():
+    small = PredictionCache.entry_bytes(b"k", 0.0)
+    cache = PredictionCache(max_entries=100, max_bytes=10 * small)
+    for i in range(5):
+        cache.put(bytes([i]), float(i))
+    big = b"x" * (6 * small)
+    cache.put(b"big", big)
+    stats = cache.stats()
+    assert stats["bytes"] <= 10 * small
+    assert cache.get(b"big") == big
+    assert stats["entries"] < 6  # the oldest small entries were evicted to make room
+
+    cache.put(b"huge", b"x" * (20 * small))  # larger than the whole cache: not stored
+    assert cache.get(b"huge") is None
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import prepare_data
+from src.preprocessor import Preprocessor
+from src.reference_stats import load_reference_stats, serving_defaults
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _raw():
+    return pd.DataFrame(
+        {
+            "Order": [1, 2, 3, 4, 5, 6],
+            "LotArea": [8000, np.nan, 9000, 12000, 10000, 11000],
+            "YearBuilt": [1990, 2000, np.nan, 2010, 2005, 1995],
+            "Neighborhood": ["NAmes", "CollgCr", "NAmes", None, "Edwards", "NAmes"],
+            "SalePrice": [150000, 180000, 200000, 220000, 210000, 190000],
+        }
+    )
+
+
+@pytest.mark.unit
+def test_fit_learns_fill_values_schema_and_categories():
+    pre = Preprocessor.fit(_raw())
+
+    assert pre.fill_values == {"LotArea": 10000.0, "YearBuilt": 2000.0, "Neighborhood": "NAmes"}
+    assert pre.numerical == ["LotArea", "YearBuilt"]
+    assert pre.encoder.categories == {"Neighborhood": ["CollgCr", "Edwards", "NAmes"]}
+    assert "Order" not in pre.dtypes
+
+
+@pytest.mark.unit
+def test_transform_of_chunks_matches_whole_frame():
+    df = _raw()
+    pre = Preprocessor.fit(df)
+
+    whole = pre.transform(df)
+    chunks = pd.concat([pre.transform(df.iloc[i:i + 2]) for i in range(0, len(df), 2)])
+
+    pd.testing.assert_frame_equal(chunks, whole)
+    assert whole.isna().sum().sum() == 0
+
+
+@pytest.mark.unit
+def test_save_load_round_trip(tmp_path):
+    df = _raw()
+    pre = Preprocessor.fit(df)
+    path = tmp_path / "preprocessor.json"
+    pre.save(path)
+
+    loaded = Preprocessor.load(path)
+
+    assert loaded.to_dict() == pre.to_dict()
+    pd.testing.assert_frame_equal(loaded.transform(df, encode=True), pre.transform(df, encode=True))
+
+
+@pytest.mark.unit
+def test_encode_matches_get_dummies_and_prepare_data_trims_before_imputing():
+    df = _raw()
+    pre = Preprocessor.fit(df)
+
+    encoded = pre.transform(df, encode=True)
+    expected = pd.get_dummies(pre.transform(df), drop_first=True)
+    assert list(encoded.columns) == list(expected.columns)
+    np.testing.assert_array_equal(encoded.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+    # Enough rows that a single extreme price lies beyond 2.5 standard deviations
+    outlier = pd.concat(
+        [df] * 3 + [pd.DataFrame({"LotArea": [np.nan], "SalePrice": [5_000_000]})], ignore_index=True
+    )
+    cleaned = prepare_data(outlier)
+    assert cleaned["SalePrice"].max() < 5_000_000
+    assert "Order" not in cleaned.columns
+
+
+@pytest.mark.unit
+def test_committed_artifacts_match_a_refit_of_the_dataset():
+    # Regenerate both with scripts/clean_data.py --input docs/datasets/AmesHousing.csv
+    preprocessor_path = ROOT / "models" / "preprocessor.json"
+    refit = Preprocessor.fit(pd.read_csv(ROOT / "docs" / "datasets" / "AmesHousing.csv"))
+
+    committed = Preprocessor.load(preprocessor_path)
+    assert committed.to_dict() == json.loads(json.dumps(refit.to_dict()))
+    # The API serves the same defaults the training data was imputed with
+    stats = load_reference_stats(ROOT / "models" / "reference_stats.json")
+    assert stats["defaults"] == committed.defaults
+    assert serving_defaults(stats, preprocessor_path) == committed.defaults
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from src import reference_stats as rs
+
+
+@pytest.mark.unit
+def test_compute_reference_stats_defaults_and_histogram(fake_data_df):
+    stats = rs.compute_reference_stats(fake_data_df, bins=4)
+    defaults = stats["defaults"]
+    assert defaults["LotArea"] == pytest.approx(fake_data_df["LotArea"].median())
+    assert defaults["Neighborhood"] == "NAmes"
+    assert "SalePrice" not in defaults
+    assert sum(stats["saleprice_histogram"]["counts"]) == len(fake_data_df)
+    assert stats["quantiles"]["GrLivArea"]["0.5"] == pytest.approx(1700.0)
+
+
+@pytest.mark.unit
+def test_save_load_roundtrip_and_schema_check(fake_data_df, tmp_path):
+    path = tmp_path / "reference_stats.json"
+    stats = rs.compute_reference_stats(fake_data_df)
+    rs.save_reference_stats(stats, path)
+    assert rs.load_reference_stats(path)["defaults"] == stats["defaults"]
+
+    path.write_text(json.dumps({**stats, "schema_version": 0}))
+    with pytest.raises(ValueError):
+        rs.load_reference_stats(path)
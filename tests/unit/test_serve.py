@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+from src import serve
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_read_memory_kb_reports_rss_and_pss():
+    mem = serve.read_memory_kb(os.getpid())
+    assert mem is not None
+    assert mem["rss"] >= mem["pss"] > 0
+
+
+@pytest.mark.unit
+def test_read_memory_kb_missing_process():
+    assert serve.read_memory_kb(-1) is None
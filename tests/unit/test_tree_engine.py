@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.dummy import DummyRegressor
+from sklearn.ensemble import RandomForestRegressor
+
+from src.tree_engine import EQUIVALENCE_ATOL, EQUIVALENCE_RTOL, FlatEnsemble, flatten_model
+
+
+def _data(with_nan=False):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6)).astype(np.float32)
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.normal(size=300)
+    if with_nan:
+        X[rng.random(X.shape) < 0.05] = np.nan
+    return X, y
+
+
+@pytest.mark.unit
+def test_random_forest_matches_native_predict():
+    X, y = _data()
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    flat = flatten_model(model)
+    assert flat.n_trees == 10
+    np.testing.assert_allclose(flat.predict(X), model.predict(X), rtol=EQUIVALENCE_RTOL, atol=EQUIVALENCE_ATOL)
+
+
+@pytest.mark.unit
+def test_xgboost_matches_native_predict_with_missing_values():
+    xgb = pytest.importorskip("xgboost")
+    X, y = _data(with_nan=True)
+    model = xgb.XGBRegressor(n_estimators=20, max_depth=4).fit(X, y)
+    flat = flatten_model(model)
+    np.testing.assert_allclose(flat.predict(X), model.predict(X), rtol=EQUIVALENCE_RTOL, atol=EQUIVALENCE_ATOL)
+    # single rows go through the same path
+    np.testing.assert_allclose(flat.predict(X[0]), model.predict(X[:1]), rtol=EQUIVALENCE_RTOL, atol=EQUIVALENCE_ATOL)
+
+
+@pytest.mark.unit
+def test_xgboost_early_stopped_model_uses_best_iteration():
+    xgb = pytest.importorskip("xgboost")
+    X, y = _data()
+    # A validation target the model can't learn stops training early
+    model = xgb.XGBRegressor(n_estimators=50, max_depth=3, num_parallel_tree=2, early_stopping_rounds=3)
+    model.fit(X[:200], y[:200], eval_set=[(X[200:], -y[200:])], verbose=False)
+    assert model.best_iteration < 40
+    flat = flatten_model(model)
+    assert flat.n_trees == (model.best_iteration + 1) * 2
+    np.testing.assert_allclose(flat.predict(X), model.predict(X), rtol=EQUIVALENCE_RTOL, atol=EQUIVALENCE_ATOL)
+
+
+@pytest.mark.unit
+def test_xgboost_non_identity_objective_is_rejected():
+    xgb = pytest.importorskip("xgboost")
+    X, y = _data()
+    model = xgb.XGBRegressor(n_estimators=3, objective="reg:gamma").fit(X, np.abs(y) + 1)
+    with pytest.raises(ValueError, match="reg:gamma"):
+        flatten_model(model)
+
+
+@pytest.mark.unit
+def test_roundtrip_and_unsupported_models():
+    X, y = _data()
+    flat = flatten_model(RandomForestRegressor(n_estimators=3, random_state=0).fit(X, y))
+    np.testing.assert_array_equal(FlatEnsemble.from_dict(flat.to_dict()).predict(X), flat.predict(X))
+    with pytest.raises(TypeError):
+        flatten_model(DummyRegressor().fit(X, y))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model_registry import build_engine
+
+xgb = pytest.importorskip("xgboost")
+
+from src.xgboost_backend import XGBoostInplaceBackend  # noqa: E402
+
+
+def _model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 4)), columns=['a', 'b', 'c', 'd'])
+    y = X['a'] * 2 + X['b'] ** 2
+    return xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(X, y), X
+
+
+@pytest.mark.unit
+def test_matches_native_predict_and_reuses_buffer():
+    model, X = _model()
+    backend = XGBoostInplaceBackend(model, ['a', 'b', 'c', 'd'])
+    X32 = np.ascontiguousarray(X, dtype=np.float32)
+    np.testing.assert_allclose(backend.predict(X32), model.predict(X32), rtol=1e-6)
+    # float64 input is copied into the thread's float32 buffer, which is kept
+    np.testing.assert_allclose(backend.predict(X.to_numpy()[:5]), model.predict(X32[:5]), rtol=1e-6)
+    buffer = backend._local.buffer
+    backend.predict(X.to_numpy()[:3])
+    assert backend._local.buffer is buffer
+    stats = backend.stats()
+    assert stats['calls'] == 3 and stats['rows'] == 208 and stats['buffer_copies'] == 2
+
+
+@pytest.mark.unit
+def test_feature_names_checked_once_at_load():
+    model, _ = _model()
+    with pytest.raises(ValueError):
+        XGBoostInplaceBackend(model, ['a', 'b', 'd', 'c'])
+    assert isinstance(build_engine('xgboost', model, 'inplace', ['a', 'b', 'c', 'd']), XGBoostInplaceBackend)